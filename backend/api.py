@@ -18,6 +18,7 @@ from typing import List, Dict, Any, Optional
 import uvicorn
 import os
 import dataclasses
+import threading
 
 from backend.orchestrator import RouteOrchestrator, RouteRequest
 
@@ -89,6 +90,18 @@ def get_orchestrator() -> RouteOrchestrator:
         orchestrator = RouteOrchestrator(config)
     return orchestrator
 
+@app.on_event("startup")
+def warm_extractor():
+    # Load the FAISS tag validator in the background so the first request doesn't pay for it
+    threading.Thread(
+        target=get_orchestrator().extractor.warm, name="llm-extractor-warm", daemon=True
+    ).start()
+
+@app.on_event("shutdown")
+def shutdown_orchestrator():
+    if orchestrator is not None:
+        orchestrator.close()
+
 @app.get("/", response_model=Dict[str, str])
 async def root():
     return {"message": "Free-form Text to Route API", "version": "1.0.0"}
@@ -0,0 +1,191 @@
+# backend/extraction/batch_extractor.py
+"""
+Offline extraction through the OpenAI Batch API.
+
+For non-interactive jobs (e.g. precomputing routes overnight) the Batch API costs
+half as much per token and draws on a separate, much larger rate-limit pool, at the
+price of up to 24h latency. The request bodies, prompts and output coercion are the
+ones LLMExtractor uses, so results are identical in shape to extract_parameters.
+
+Because step 3 needs the FAISS candidates for step 1's preferences, a full
+extraction is two batches:
+
+    bx = BatchExtractor()
+    pref_batch = bx.submit(prompts)                      # step 1
+    bx.wait(pref_batch)
+    preferences = bx.collect(pref_batch)                 # {custom_id: text}
+    extract_batch = bx.submit_extraction(prompts, preferences)   # steps 2-3
+    bx.wait(extract_batch)
+    params = bx.collect_parameters(extract_batch, preferences)
+
+or simply `bx.extract(prompts)`, which blocks through both batches.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+import logging
+import os
+import time
+
+import requests
+
+from backend.extraction.llm_extractor import LLMExtractor, ExtractedParameters
+from backend.json_utils import json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL_S = float(os.getenv("OPENAI_BATCH_POLL_INTERVAL_S", "60"))
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+def _custom_id(i: int) -> str:
+    return f"task-{i}"
+
+
+class BatchExtractor:
+    """Submit, poll and collect OpenAI Batch API jobs for the extraction pipeline."""
+
+    def __init__(self, extractor: Optional[LLMExtractor] = None, num_tags: int = 5):
+        self.extractor = extractor or LLMExtractor()
+        self.num_tags = num_tags
+        if not self.extractor.api_key:
+            raise RuntimeError("No OpenAI API key configured. Set OPENAI_API_KEY or LLM_API_KEY.")
+        self._base_url = self.extractor.base_url
+        # multipart uploads set their own Content-Type, so only send auth here
+        self._auth = {"Authorization": f"Bearer {self.extractor.api_key}"}
+        self._session = requests.Session()
+
+    # ----------------- Submission -----------------
+
+    def submit(self, prompts: List[str]) -> str:
+        """Step 1 (preference concepts) for every prompt; returns the batch id."""
+        bodies = [self.extractor.preference_request_body(p) for p in prompts]
+        return self._submit_bodies(bodies)
+
+    def submit_extraction(self, prompts: List[str], preferences: Dict[str, str]) -> str:
+        """
+        Steps 2-3 for the prompts whose preferences came back from a `submit` batch.
+        `preferences` is the output of `collect` on that batch; prompts without
+        usable preferences are skipped (and come back as None from collect_parameters).
+        """
+        bodies: Dict[str, Dict[str, Any]] = {}
+        for i, prompt in enumerate(prompts):
+            prefs = (preferences.get(_custom_id(i)) or "").strip()
+            if not prefs:
+                continue
+            bodies[_custom_id(i)] = self.extractor.extraction_request_body(prompt, prefs, self.num_tags)
+        if not bodies:
+            raise ValueError("No prompts with usable preferences to extract")
+        return self._submit_bodies(bodies)
+
+    def _submit_bodies(self, bodies: List[Dict[str, Any]] | Dict[str, Dict[str, Any]]) -> str:
+        items = bodies.items() if isinstance(bodies, dict) else ((_custom_id(i), b) for i, b in enumerate(bodies))
+        jsonl = b"\n".join(
+            json_dumps({"custom_id": cid, "method": "POST", "url": "/v1/chat/completions", "body": body})
+            for cid, body in items
+        )
+        resp = self._session.post(
+            f"{self._base_url}/files",
+            headers=self._auth,
+            files={"file": ("detourist_batch.jsonl", jsonl, "application/jsonl")},
+            data={"purpose": "batch"},
+            timeout=120,
+        )
+        resp.raise_for_status()
+        file_id = json_loads(resp.content)["id"]
+
+        resp = self._session.post(
+            f"{self._base_url}/batches",
+            headers=self._auth,
+            json={
+                "input_file_id": file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": BATCH_COMPLETION_WINDOW,
+            },
+            timeout=40,
+        )
+        resp.raise_for_status()
+        batch_id = json_loads(resp.content)["id"]
+        logger.info("[BatchExtractor] submitted batch=%s file=%s", batch_id, file_id)
+        return batch_id
+
+    # ----------------- Polling -----------------
+
+    def poll(self, batch_id: str) -> Dict[str, Any]:
+        """Current batch object (status, request_counts, output_file_id, ...)."""
+        resp = self._session.get(f"{self._base_url}/batches/{batch_id}", headers=self._auth, timeout=40)
+        resp.raise_for_status()
+        return json_loads(resp.content)
+
+    def wait(self, batch_id: str, poll_interval_s: float = BATCH_POLL_INTERVAL_S) -> Dict[str, Any]:
+        """Block until the batch reaches a terminal status; raise unless it completed."""
+        while True:
+            batch = self.poll(batch_id)
+            status = batch.get("status")
+            if status in BATCH_TERMINAL_STATUSES:
+                break
+            logger.info("[BatchExtractor] batch=%s status=%s counts=%s",
+                        batch_id, status, batch.get("request_counts"))
+            time.sleep(poll_interval_s)
+        if status != "completed":
+            raise RuntimeError(f"OpenAI batch {batch_id} ended with status={status}")
+        return batch
+
+    # ----------------- Collection -----------------
+
+    def collect(self, batch_id: str) -> Dict[str, str]:
+        """Message content per custom_id for a completed batch (failed rows are omitted)."""
+        batch = self.poll(batch_id)
+        if batch.get("status") != "completed":
+            raise RuntimeError(f"OpenAI batch {batch_id} is not completed (status={batch.get('status')})")
+        if not batch.get("output_file_id"):
+            return {}
+
+        resp = self._session.get(
+            f"{self._base_url}/files/{batch['output_file_id']}/content", headers=self._auth, timeout=120
+        )
+        resp.raise_for_status()
+
+        out: Dict[str, str] = {}
+        for line in resp.content.splitlines():
+            if not line.strip():
+                continue
+            row = json_loads(line)
+            response = row.get("response") or {}
+            if row.get("error") or response.get("status_code") != 200:
+                logger.warning("[BatchExtractor] %s failed: %s", row.get("custom_id"),
+                               row.get("error") or response.get("status_code"))
+                continue
+            out[row["custom_id"]] = self.extractor.response_content(response["body"])
+        return out
+
+    def collect_parameters(
+        self, batch_id: str, preferences: Dict[str, str]
+    ) -> Dict[str, ExtractedParameters]:
+        """Parsed ExtractedParameters per custom_id for a completed submit_extraction batch."""
+        params: Dict[str, ExtractedParameters] = {}
+        for cid, raw in self.collect(batch_id).items():
+            try:
+                params[cid] = self.extractor.parameters_from_content(raw, preferences[cid].strip())
+            except ValueError:
+                continue  # already logged by the extractor
+        return params
+
+    def extract(
+        self, prompts: List[str], poll_interval_s: float = BATCH_POLL_INTERVAL_S
+    ) -> List[Optional[ExtractedParameters]]:
+        """Run both batches end to end; results are in prompt order (None where a row failed)."""
+        pref_batch = self.submit(prompts)
+        self.wait(pref_batch, poll_interval_s)
+        preferences = self.collect(pref_batch)
+
+        extract_batch = self.submit_extraction(prompts, preferences)
+        self.wait(extract_batch, poll_interval_s)
+        params = self.collect_parameters(extract_batch, preferences)
+        return [params.get(_custom_id(i)) for i in range(len(prompts))]
+
+    def close(self) -> None:
+        self._session.close()
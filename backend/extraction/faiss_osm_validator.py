@@ -11,14 +11,25 @@ import requests
 import time
 import numpy as np
 import os
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from backend.json_utils import json_loads
+
 # FAISS imports (will be installed when dependencies are available)
 try:
     import faiss
     FAISS_AVAILABLE = True
+    # PyPI faiss-cpu wheels pick the AVX2/AVX512 build at import when the CPU supports it;
+    # log which one is active so a generic (scalar) build is easy to spot.
+    logging.getLogger(__name__).info(
+        "FAISS %s compile options: %s",
+        getattr(faiss, "__version__", "?"),
+        faiss.get_compile_options() if hasattr(faiss, "get_compile_options") else "unknown",
+    )
 except ImportError:
     FAISS_AVAILABLE = False
     print("Warning: FAISS not available. Install with: pip install faiss-cpu")
@@ -31,6 +42,45 @@ except ImportError:
     TRANSFORMERS_AVAILABLE = False
     print("Warning: SentenceTransformers not available. Install with: pip install sentence-transformers")
 
+# torch comes with sentence-transformers; only needed to run the encoder in reduced precision
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+# Tags used fewer times than this (taginfo count_all) are skipped: rare values are
+# mostly typos/one-offs that add noise to nearest-neighbour search. Override with env.
+MIN_TAG_COUNT = int(os.getenv("OSM_TAG_MIN_COUNT", "500"))
+
+# HNSW graph parameters for the tag index (approximate search, no training step)
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 32
+
+# Index type for the tag catalog: "hnsw" (default) or "ivfpq". IVF-PQ stores 8-byte
+# codes instead of fp32 vectors (~190x smaller for 384-d), at some recall cost;
+# useful when many workers each hold a copy. It needs enough vectors to train.
+INDEX_TYPE = os.getenv("OSM_TAG_INDEX_TYPE", "hnsw").lower()
+IVFPQ_NLIST = 64
+IVFPQ_M = 8
+IVFPQ_NBITS = 8
+IVFPQ_NPROBE = 8
+IVFPQ_MIN_TRAIN = 4 * max(IVFPQ_NLIST, 2 ** IVFPQ_NBITS)
+
+# Encoder precision: "auto" runs fp16 on CUDA and fp32 on CPU, "bf16" opts CPUs with
+# native bfloat16 matmul (AMX/AVX512-BF16) into bf16 autocast, "fp32" disables both.
+# Only the encoder runs in low precision; vectors handed to FAISS are always float32.
+EMBEDDING_PRECISION = os.getenv("OSM_TAG_EMBEDDING_PRECISION", "auto").lower()
+
+# Per-concept search results kept by the validator ("parks" -> tags), LRU-bounded
+CONCEPT_CACHE_SIZE = int(os.getenv("OSM_TAG_CONCEPT_CACHE_SIZE", "4096"))
+
+# Ids per "id IN (...)" query; well under SQLite's bound-variable limit (999 on older builds)
+SQLITE_ID_CHUNK = 500
+
+_TAG_COLUMNS = "id, key, value, description, count_all, count_nodes, count_ways, count_relations, wiki_description"
+
 
 @dataclass
 class OSMTag:
@@ -61,24 +111,31 @@ class TagSearchResult:
 class FAISSOSMTagDatabase:
     """FAISS-based OSM tag database with vector search capabilities."""
     
-    def __init__(self, db_path: str = "osm_tags_faiss.db", embedding_model: str = "all-MiniLM-L6-v2", include_descriptions_in_faiss_index: bool = True):
+    def __init__(self, db_path: str = "osm_tags_faiss.db", embedding_model: str = "all-MiniLM-L6-v2", include_descriptions_in_faiss_index: bool = True, min_tag_count: int = MIN_TAG_COUNT):
         """Initialize the FAISS OSM tag database."""
         self.db_path = db_path
         self.embedding_model_name = embedding_model
         self.include_descriptions_in_faiss_index = include_descriptions_in_faiss_index
+        self.min_tag_count = min_tag_count
         self.logger = logging.getLogger(__name__)
+        # FAISS row -> SQLite id (FAISS rows are dense 0..N-1, DB ids are not)
+        self._id_map = np.empty(0, dtype=np.int64)
+        # FAISS row -> tag metadata row, filled by warm(); None means read from SQLite
+        self._row_tags: Optional[List[tuple]] = None
         
         # Initialize embedding model
+        self._autocast: Optional[Tuple[str, Any]] = None
         if TRANSFORMERS_AVAILABLE:
             self.embedding_model = SentenceTransformer(embedding_model)
             self.embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
+            self._configure_encoder_precision()
         else:
             self.embedding_model = None
             self.embedding_dim = 384  # Default for all-MiniLM-L6-v2
         
         # Initialize FAISS index
         if FAISS_AVAILABLE:
-            self.faiss_index = faiss.IndexFlatIP(self.embedding_dim)  # Inner product for cosine similarity
+            self.faiss_index = self._new_faiss_index()
             # Try to load existing FAISS index
             self._load_faiss_index()
         else:
@@ -95,6 +152,28 @@ class FAISSOSMTagDatabase:
         
         self._init_database()
     
+    def _configure_encoder_precision(self):
+        """Move the encoder to fp16 on CUDA (or bf16 autocast on CPU) per EMBEDDING_PRECISION."""
+        if not TORCH_AVAILABLE or EMBEDDING_PRECISION == "fp32":
+            return
+        if torch.cuda.is_available() and EMBEDDING_PRECISION in ("auto", "fp16"):
+            self.embedding_model = self.embedding_model.half().to("cuda")
+            self._autocast = ("cuda", torch.float16)
+        elif EMBEDDING_PRECISION == "bf16":
+            torch.set_float32_matmul_precision("medium")
+            self._autocast = ("cpu", torch.bfloat16)
+        if self._autocast:
+            self.logger.info(f"Embedding encoder precision: {self._autocast[0]} {self._autocast[1]}")
+
+    def _encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Encode texts with the configured precision; always returns a float32 matrix."""
+        if self._autocast is None:
+            embeddings = self.embedding_model.encode(texts, convert_to_numpy=True, **kwargs)
+        else:
+            with torch.autocast(self._autocast[0], dtype=self._autocast[1]):
+                embeddings = self.embedding_model.encode(texts, convert_to_numpy=True, **kwargs)
+        return np.asarray(embeddings, dtype=np.float32)
+
     def _init_database(self):
         """Initialize the SQLite database for OSM tags with embeddings."""
         conn = sqlite3.connect(self.db_path)
@@ -147,19 +226,99 @@ class FAISSOSMTagDatabase:
         
         self.logger.info("FAISS OSM tag database build complete")
     
+    def _new_faiss_index(self, training_vectors: Optional[np.ndarray] = None):
+        """
+        Empty index over inner product (cosine similarity on normalized vectors).
+        IVF-PQ is used only when requested and enough training vectors are given;
+        otherwise HNSW.
+        """
+        if INDEX_TYPE == "ivfpq" and training_vectors is not None:
+            if len(training_vectors) >= IVFPQ_MIN_TRAIN:
+                quantizer = faiss.IndexFlatIP(self.embedding_dim)
+                index = faiss.IndexIVFPQ(
+                    quantizer, self.embedding_dim, IVFPQ_NLIST, IVFPQ_M, IVFPQ_NBITS, faiss.METRIC_INNER_PRODUCT
+                )
+                index.train(training_vectors)
+                index.nprobe = IVFPQ_NPROBE
+                return index
+            self.logger.warning(
+                f"Only {len(training_vectors)} vectors (< {IVFPQ_MIN_TRAIN}) to train IVF-PQ; using HNSW instead"
+            )
+        index = faiss.IndexHNSWFlat(self.embedding_dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
+    def _configure_search(self):
+        # Indexes loaded from disk may be legacy flat indexes without an HNSW graph
+        if hasattr(self.faiss_index, "hnsw"):
+            self.faiss_index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif hasattr(self.faiss_index, "nprobe"):
+            self.faiss_index.nprobe = IVFPQ_NPROBE
+
+    def _id_map_path(self) -> str:
+        return self.db_path.replace('.db', '.ids.npy')
+
+    def _embeddings_path(self) -> str:
+        return self.db_path.replace('.db', '.emb.npy')
+
+    @staticmethod
+    def _save_npy(path: str, array: np.ndarray):
+        """np.save via a temp file and rename, so readers never see a half-written file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as fh:
+            np.save(fh, array)
+        os.replace(tmp_path, path)
+
+    def _rebuild_index_from_npy(self) -> bool:
+        """
+        Rebuild the FAISS index from the saved embedding matrix without re-encoding.
+        The .npy is memory-mapped, so only the pages FAISS copies are read.
+        """
+        emb_path, id_map_path = self._embeddings_path(), self._id_map_path()
+        if not (os.path.exists(emb_path) and os.path.exists(id_map_path)):
+            return False
+        embeddings = np.load(emb_path, mmap_mode="r")
+        id_map = np.load(id_map_path)
+        if embeddings.ndim != 2 or embeddings.shape != (len(id_map), self.embedding_dim):
+            self.logger.warning(f"Ignoring {emb_path}: shape {embeddings.shape} does not match the id map")
+            return False
+        self.faiss_index = self._new_faiss_index(training_vectors=embeddings)
+        self.faiss_index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+        self._id_map = id_map
+        self._row_tags = None
+        faiss.write_index(self.faiss_index, self.db_path.replace('.db', '.faiss'))
+        self.logger.info(f"Rebuilt FAISS index from {emb_path} with {self.faiss_index.ntotal} vectors")
+        return True
+
     def _load_faiss_index(self):
-        """Load FAISS index from disk if it exists."""
+        """Load FAISS index (and its row -> id map) from disk if it exists."""
         faiss_index_path = self.db_path.replace('.db', '.faiss')
         try:
             if os.path.exists(faiss_index_path):
                 self.faiss_index = faiss.read_index(faiss_index_path)
+                self._configure_search()
+                id_map_path = self._id_map_path()
+                if os.path.exists(id_map_path):
+                    self._id_map = np.load(id_map_path)
+                else:
+                    # Legacy index built from every row in id order
+                    self._id_map = np.arange(1, self.faiss_index.ntotal + 1, dtype=np.int64)
+                self._row_tags = None
                 self.logger.info(f"Loaded FAISS index from {faiss_index_path} with {self.faiss_index.ntotal} vectors")
-            else:
-                self.logger.info("No existing FAISS index found, will build new one")
+                return
         except Exception as e:
             self.logger.warning(f"Failed to load FAISS index: {str(e)}")
             # Reset to empty index
-            self.faiss_index = faiss.IndexFlatIP(self.embedding_dim)
+            self.faiss_index = self._new_faiss_index()
+            self._id_map = np.empty(0, dtype=np.int64)
+            self._row_tags = None
+        try:
+            if self._rebuild_index_from_npy():
+                return
+        except Exception as e:
+            self.logger.warning(f"Failed to rebuild FAISS index from embeddings: {str(e)}")
+        self.logger.info("No existing FAISS index found, will build new one")
     
     def _fetch_tags_from_taginfo(self):
         """Fetch real OSM tags from taginfo API."""
@@ -175,7 +334,7 @@ class FAISSOSMTagDatabase:
                 response = requests.get(url, params=params, timeout=30)
                 response.raise_for_status()
                 
-                data = response.json()
+                data = json_loads(response.content)
                 tags = data.get("data", [])
                 
                 self.logger.info(f"Found {len(tags)} tags for key '{key}'")
@@ -199,6 +358,10 @@ class FAISSOSMTagDatabase:
         cursor = conn.cursor()
         
         for tag in tags:
+            # Skip rare values; they only add noise to the index
+            if int(tag.get("count_all", 0) or 0) < self.min_tag_count:
+                continue
+
             # Extract wiki description
             wiki_description = None
             if "wiki" in tag and "en" in tag["wiki"]:
@@ -238,7 +401,10 @@ class FAISSOSMTagDatabase:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute("SELECT id, search_text FROM osm_tags ORDER BY id")
+        cursor.execute(
+            "SELECT id, search_text FROM osm_tags WHERE count_all >= ? ORDER BY id",
+            (self.min_tag_count,),
+        )
         rows = cursor.fetchall()
         
         if not rows:
@@ -246,24 +412,31 @@ class FAISSOSMTagDatabase:
             conn.close()
             return
         
-        # Generate embeddings
+        # Embed each distinct search text once, then fan back out to rows
         search_texts = [row[1] for row in rows]
-        embeddings = self.embedding_model.encode(search_texts)
+        unique_texts, inverse = np.unique(np.array(search_texts, dtype=object), return_inverse=True)
+        unique_embeddings = self._encode(list(unique_texts))
         
         # Normalize embeddings for cosine similarity
-        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        unique_embeddings = unique_embeddings / np.linalg.norm(unique_embeddings, axis=1, keepdims=True)
+        embeddings = unique_embeddings[inverse.reshape(-1)]
         
-        # Add to FAISS index
-        self.faiss_index.add(embeddings.astype('float32'))
+        # Add to a fresh FAISS index (replacing any previous contents so rows stay aligned with _id_map)
+        embeddings = embeddings.astype('float32')
+        self.faiss_index = self._new_faiss_index(training_vectors=embeddings)
+        self.faiss_index.add(embeddings)
+        self._id_map = np.array([row[0] for row in rows], dtype=np.int64)
+        self._row_tags = None
         
-        # Save FAISS index to disk
+        # Save FAISS index (and row -> id map) to disk
         faiss_index_path = self.db_path.replace('.db', '.faiss')
         faiss.write_index(self.faiss_index, faiss_index_path)
+        self._save_npy(self._id_map_path(), self._id_map)
+        # Raw vectors too, so a lost/corrupt .faiss (or a new index type) needs no re-encoding
+        self._save_npy(self._embeddings_path(), embeddings)
         self.logger.info(f"Saved FAISS index to {faiss_index_path}")
         
-        # Store embeddings in database
-        cursor.execute("DELETE FROM osm_tags WHERE embedding IS NOT NULL")  # Clear old embeddings
-        
+        # Store embeddings in database (force_rebuild already cleared stale rows)
         for i, (tag_id, _) in enumerate(rows):
             embedding_blob = embeddings[i].astype('float32').tobytes()
             cursor.execute('''
@@ -273,7 +446,7 @@ class FAISSOSMTagDatabase:
         conn.commit()
         conn.close()
         
-        self.logger.info(f"Built FAISS index with {len(rows)} tags")
+        self.logger.info(f"Built FAISS index with {len(rows)} tags ({len(unique_texts)} distinct texts embedded)")
     
     def _clear_database(self):
         """Clear all data from the database."""
@@ -285,6 +458,32 @@ class FAISSOSMTagDatabase:
         
         if self.faiss_index:
             self.faiss_index.reset()
+        self._id_map = np.empty(0, dtype=np.int64)
+        self._row_tags = None
+
+    def warm(self) -> int:
+        """
+        Load the metadata of every indexed tag into memory (aligned with FAISS rows) so
+        searches are pure index + array lookups with no SQLite I/O. Returns rows loaded.
+        """
+        if not len(self._id_map):
+            return 0
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {_TAG_COLUMNS} FROM osm_tags WHERE count_all >= ?", (self.min_tag_count,))
+        rows_by_id = {row[0]: row for row in cursor.fetchall()}
+        missing = [int(i) for i in self._id_map if int(i) not in rows_by_id]
+        if missing:
+            # Legacy index built before the count threshold: fetch the rest by id
+            for start in range(0, len(missing), SQLITE_ID_CHUNK):
+                chunk = missing[start:start + SQLITE_ID_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT {_TAG_COLUMNS} FROM osm_tags WHERE id IN ({placeholders})", chunk)
+                rows_by_id.update({row[0]: row for row in cursor.fetchall()})
+        conn.close()
+        self._row_tags = [rows_by_id.get(int(i)) for i in self._id_map]
+        self.logger.info(f"Warmed {len(self._row_tags)} OSM tags into memory")
+        return len(self._row_tags)
     
     def vector_search(self, query: str, top_k: int = 10) -> TagSearchResult:
         """
@@ -297,6 +496,23 @@ class FAISSOSMTagDatabase:
         Returns:
             TagSearchResult with most similar tags
         """
+        return self.batch_vector_search([query], top_k)[0]
+    
+    def batch_vector_search(self, queries: List[str], top_k: int = 10) -> List[TagSearchResult]:
+        """
+        Search for OSM tags for several queries at once.
+        
+        All queries are embedded in one encode() call and searched with a single
+        FAISS search over the (N, d) query matrix; matching rows are then read from
+        SQLite in one query.
+        
+        Args:
+            queries: Search queries (e.g., individual preference concepts)
+            top_k: Number of top results to return per query
+            
+        Returns:
+            One TagSearchResult per query, in the same order
+        """
         if not FAISS_AVAILABLE:
             raise Exception("FAISS is not available. Install with: pip install faiss-cpu")
         
@@ -306,53 +522,59 @@ class FAISSOSMTagDatabase:
         if not self.faiss_index or self.faiss_index.ntotal == 0:
             raise Exception("FAISS index is empty or not built. Call build_database_from_taginfo() first.")
         
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])
-        query_embedding = query_embedding / np.linalg.norm(query_embedding, axis=1, keepdims=True)
-        
-        # Search FAISS index
-        scores, indices = self.faiss_index.search(query_embedding.astype('float32'), top_k)
+        if not queries:
+            return []
         
-        # Retrieve tags from database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Generate query embeddings (L2-normalized by the encoder for cosine similarity)
+        query_embeddings = self._encode(list(queries), batch_size=32, normalize_embeddings=True)
         
-        tags = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx == -1:  # FAISS returns -1 for empty results
-                continue
-                
-            cursor.execute('''
-                SELECT id, key, value, description, count_all, count_nodes, count_ways, count_relations, wiki_description
-                FROM osm_tags WHERE id = ?
-            ''', (int(idx) + 1,))  # FAISS indices are 0-based, DB IDs are 1-based
+        # Search FAISS index
+        scores, indices = self.faiss_index.search(query_embeddings, top_k)
+        
+        row_tags = self._row_tags
+        rows_by_id: Dict[int, tuple] = {}
+        if row_tags is None:
+            # Not warmed: retrieve all hit tags from database in one round trip
+            hit_ids = sorted({int(self._id_map[idx]) for idx in indices.ravel() if idx != -1})  # -1 = no result
+            if hit_ids:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                placeholders = ",".join("?" * len(hit_ids))
+                cursor.execute(f"SELECT {_TAG_COLUMNS} FROM osm_tags WHERE id IN ({placeholders})", hit_ids)
+                rows_by_id = {row[0]: row for row in cursor.fetchall()}
+                conn.close()
+        
+        results = []
+        for qi, query in enumerate(queries):
+            tags = []
+            for score, idx in zip(scores[qi], indices[qi]):
+                if idx == -1:
+                    continue
+                row = row_tags[idx] if row_tags is not None else rows_by_id.get(int(self._id_map[idx]))
+                if row:
+                    tags.append(OSMTag(
+                        tag_id=row[0],
+                        key=row[1],
+                        value=row[2],
+                        description=row[3],
+                        count_all=row[4],
+                        count_nodes=row[5],
+                        count_ways=row[6],
+                        count_relations=row[7],
+                        wiki_description=row[8],
+                        embedding=None,  # Don't load embeddings for results
+                        score=float(score)  # Store the similarity score
+                    ))
             
-            row = cursor.fetchone()
-            if row:
-                tag = OSMTag(
-                    tag_id=row[0],
-                    key=row[1],
-                    value=row[2],
-                    description=row[3],
-                    count_all=row[4],
-                    count_nodes=row[5],
-                    count_ways=row[6],
-                    count_relations=row[7],
-                    wiki_description=row[8],
-                    embedding=None,  # Don't load embeddings for results
-                    score=float(score)  # Store the similarity score
-                )
-                tags.append(tag)
-        
-        conn.close()
+            results.append(TagSearchResult(
+                query=query,
+                tags=tags,
+                search_method="faiss_vector_search",
+                confidence=float(scores[qi][0]) if scores[qi][0] > 0 else 0.0,
+                query_embedding=query_embeddings[qi]
+            ))
         
-        return TagSearchResult(
-            query=query,
-            tags=tags,
-            search_method="faiss_vector_search",
-            confidence=float(scores[0][0]) if scores[0][0] > 0 else 0.0,
-            query_embedding=query_embedding[0]
-        )
+        return results
     
     
     def get_database_stats(self) -> Dict[str, Any]:
@@ -389,6 +611,30 @@ class FAISSOSMTagValidator:
         """Initialize the validator with FAISS OSM tag database."""
         self.db = FAISSOSMTagDatabase(db_path, include_descriptions_in_faiss_index=include_descriptions_in_faiss_index)
         self.logger = logging.getLogger(__name__)
+        # Cached result of the SQLite check; only a positive answer is cached
+        self._populated: Optional[bool] = None
+        # One first-use build at a time (warm() may run in a background thread)
+        self._build_lock = threading.Lock()
+        # (concept, top_k) -> tags; cleared whenever the index is rebuilt
+        self._concept_cache: "OrderedDict[Tuple[str, int], List[OSMTag]]" = OrderedDict()
+        self._concept_lock = threading.Lock()
+
+    def warm(self) -> None:
+        """Build the database if needed and load tag metadata into memory (call at startup)."""
+        self._ensure_populated()
+        self.db.warm()
+
+    def _ensure_populated(self) -> None:
+        if self._is_database_populated():
+            return
+        with self._build_lock:
+            # Build database if it doesn't exist or is empty
+            if not self._is_database_populated():
+                self.logger.info("Building OSM tag database on first use...")
+                self.db.build_database_from_taginfo()
+                self._populated = None
+                with self._concept_lock:
+                    self._concept_cache.clear()
     
     def get_candidate_tags(self, user_prompt: str, top_k: int = 15) -> List[OSMTag]:
         """
@@ -401,20 +647,32 @@ class FAISSOSMTagValidator:
         Returns:
             List of candidate OSMTag objects
         """
-        # Build database if it doesn't exist or is empty
-        if not self._is_database_populated():
-            self.logger.info("Building OSM tag database on first use...")
-            self.db.build_database_from_taginfo()
-        
         # Split preferences into individual concepts
-        concepts = [concept.strip() for concept in user_prompt.split(',')]
+        concepts = [concept.strip() for concept in user_prompt.split(',') if concept.strip()]
+        if not concepts:
+            return []
+        
+        self._ensure_populated()
+        
+        # Distribute top_k among concepts; search all uncached concepts in one batch
+        concept_top_k = max(3, top_k // len(concepts))
+        keys = [(concept.lower(), concept_top_k) for concept in concepts]
+        with self._concept_lock:
+            found = {key: self._concept_cache[key] for key in keys if key in self._concept_cache}
+            for key in found:
+                self._concept_cache.move_to_end(key)
+        misses = list(dict.fromkeys(key for key in keys if key not in found))
+        if misses:
+            searched = self.db.batch_vector_search([concept for concept, _ in misses], concept_top_k)
+            with self._concept_lock:
+                for key, concept_results in zip(misses, searched):
+                    found[key] = self._concept_cache[key] = concept_results.tags
+                while len(self._concept_cache) > CONCEPT_CACHE_SIZE:
+                    self._concept_cache.popitem(last=False)
         
         all_candidates = []
-        for concept in concepts:
-            # Distribute top_k among concepts
-            concept_top_k = max(3, top_k // len(concepts))
-            concept_results = self.db.vector_search(concept, concept_top_k)
-            all_candidates.extend(concept_results.tags)
+        for key in keys:
+            all_candidates.extend(found[key])
         
         # Simple deduplication - remove duplicates
         seen = set()
@@ -429,18 +687,21 @@ class FAISSOSMTagValidator:
     
     def _is_database_populated(self) -> bool:
         """Check if the database has tags AND FAISS index is built."""
-        import sqlite3
+        # In-memory check first; this also catches a cleared/rebuilt index
+        has_faiss_index = bool(self.db.faiss_index and self.db.faiss_index.ntotal > 0)
+        if not has_faiss_index:
+            return False
+        if self._populated:
+            return True
+        
         conn = sqlite3.connect(self.db.db_path)
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM osm_tags")
-        count = cursor.fetchone()[0]
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM osm_tags LIMIT 1)")
+        has_tags = bool(cursor.fetchone()[0])
         conn.close()
         
-        # Check both database and FAISS index
-        has_tags = count > 0
-        has_faiss_index = self.db.faiss_index and self.db.faiss_index.ntotal > 0
-        
-        return has_tags and has_faiss_index
+        self._populated = has_tags
+        return has_tags
     
     def enhance_waypoint_queries(self, user_prompt: str, llm_queries: List[str] = None) -> List[str]:
         """
@@ -2,27 +2,404 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from contextlib import aclosing
+from types import MappingProxyType
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, FrozenSet
 import os
-import json
+import re
+import sys
+import time
+import random
+import asyncio
+import hashlib
 import logging
-import textwrap
+import threading
 
+import httpx
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 
+# Optional cross-process cache for extractions (used only when EXTRACTOR_CACHE=1)
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# HTTP/2 for the async OpenAI client (httpx needs the h2 package for it)
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# Stands in for the prompt when pre-serializing request bodies (see _chat_payload)
+_PROMPT_SENTINEL = "\x00detourist-prompt\x00"
+
+from backend.json_utils import extract_json_span, json_dumps, json_loads
 from backend.extraction.faiss_osm_validator import FAISSOSMTagValidator
-from backend.extraction.prompts import create_extraction_prompt_with_candidates, PREFERENCE_EXTRACTION_PROMPT
+from backend.extraction.prompts import (
+    create_extraction_prompt_with_candidates,
+    create_batch_extraction_prompt_with_candidates,
+    create_preference_batch_prompt,
+    PREFERENCE_EXTRACTION_PROMPT,
+)
 
+# Library module: handlers/levels belong to the application entrypoint
 logger = logging.getLogger(__name__)
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(level=LOG_LEVEL)
+logger.addHandler(logging.NullHandler())
+
+# Step-3 JSON is well under 200 tokens; cap output to bound latency/cost of runaway completions.
+# A fixed seed keeps repeated prompts (and the extraction cache) as deterministic as possible.
+OPENAI_JSON_MAX_TOKENS = int(os.getenv("OPENAI_JSON_MAX_TOKENS", "300"))
+OPENAI_SEED = 42
+
+# extract_parameters_many packs up to this many prompts into each OpenAI request
+# (RPM, not TPM, is the binding limit for these small prompts).
+EXTRACTOR_BATCH_SIZE = int(os.getenv("EXTRACTOR_BATCH_SIZE", "8"))
+PREFERENCE_MAX_TOKENS_PER_TASK = 60
+
+# Transient OpenAI failures (rate limits, 5xx, connection errors) are retried with
+# jittered exponential backoff instead of failing the whole extraction.
+OPENAI_MAX_ATTEMPTS = int(os.getenv("OPENAI_MAX_ATTEMPTS", "4"))
+OPENAI_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+OPENAI_BACKOFF_MIN_S = 0.5
+OPENAI_BACKOFF_MAX_S = 8.0
+
+# Async client pool: sized for many concurrent extract_parameters_async calls
+# multiplexed over a few keep-alive (HTTP/2 when available) connections.
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "1") == "1" and H2_AVAILABLE
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "32"))
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry number `attempt + 1` (full jitter, capped)."""
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), 30.0)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    ceiling = min(OPENAI_BACKOFF_MAX_S, OPENAI_BACKOFF_MIN_S * (2 ** attempt))
+    return max(OPENAI_BACKOFF_MIN_S, random.uniform(0, ceiling))
+
+
+OPENAI_STREAM_CHUNK_BYTES = 1024
+
+
+def _read_json_stream(resp: requests.Response) -> Any:
+    """
+    Parse a streamed (stream=True) JSON body as soon as the buffer holds a complete
+    document, instead of waiting for requests to buffer it. Parsing is only attempted
+    when the buffer ends in "}", so a 1-2 chunk response costs one parse.
+    """
+    chunks = resp.iter_content(chunk_size=OPENAI_STREAM_CHUNK_BYTES)
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        if not buf.rstrip().endswith(b"}"):
+            continue
+        try:
+            data = json_loads(bytes(buf))
+        except ValueError:
+            continue  # a "}" inside the document, keep reading
+        for _ in chunks:
+            pass  # drain trailing whitespace so the connection goes back to the pool
+        return data
+    return json_loads(bytes(buf))
+
+
+# Prompts that are only "<origin> to <destination>" (optionally "walk/drive from ...")
+# carry no preferences, so they are parsed locally instead of spending two OpenAI calls.
+# Opt-in: the local parse skips the LLM's "make places as specific as possible" step.
+SMART_ROUTING_ENABLED = os.getenv("EXTRACTOR_SMART_ROUTING", "0") == "1"
+SIMPLE_PROMPT_MAX_CHARS = 120
+_SIMPLE_PROMPT_RE = re.compile(
+    r"^\s*(?:(?P<verb>walk|walking|drive|driving)\s+)?(?:from\s+)?"
+    r"(?P<origin>[\w\s,.'-]+?)\s+(?:to|->|\u2192)\s+(?P<destination>[\w\s,.'-]+?)\s*[.!]?\s*$",
+    re.IGNORECASE,
+)
+# Any of these in origin/destination means the prompt says more than "A to B"
+_DETOUR_HINT_WORDS = frozenset({
+    "via", "through", "thru", "with", "along", "past", "near", "around", "avoid", "avoiding",
+    "scenic", "stop", "stopping", "visit", "see", "and", "but", "detour", "extra", "minutes",
+    "minute", "mins", "min", "hour", "hours", "want", "like", "prefer", "please", "route",
+    "from", "to", "walk", "walking", "drive", "driving", "bike", "biking", "cycling",
+})
+# A one-word endpoint that is one of these (or all lowercase) is an activity or a generic
+# place, not a location: "coffee to go", "Things to do", "Cafe to Library, Berkeley"
+_COMMON_ENDPOINT_WORDS = frozenset({
+    "go", "do", "eat", "drink", "relax", "rest", "sleep", "shop", "shopping", "play", "work",
+    "run", "read", "study", "chill", "explore", "get", "make", "have", "be", "try", "buy",
+    "things", "thing", "ways", "way", "places", "place", "stuff", "something", "somewhere",
+    "anywhere", "everywhere", "home", "coffee", "cafe", "library", "park", "school",
+    "office", "store", "shop", "restaurant", "bar", "gym", "beach", "museum", "downtown",
+})
+_PROMPT_WORD_RE = re.compile(r"[a-z']+")
+# Short comma-separated keyword lists ("coffee, bookstore, park") are already the
+# preference string step 1 would return, so they skip that OpenAI call. Opt-in: a short
+# place name such as "Berkeley, CA" would otherwise be taken as the preference string.
+KEYWORD_PREFERENCES_ENABLED = os.getenv("EXTRACTOR_KEYWORD_PREFERENCES", "0") == "1"
+KEYWORD_PROMPT_MAX_CHARS = 80
+_VERB_RE = re.compile(r"\b(find|go|drive|walk|want|near|between|from|to|avoid|via|through)\b", re.IGNORECASE)
+# Canonical (interned) transport-mode strings shared by every ExtractedParameters
+_TRANSPORT_MODES = {m: sys.intern(m) for m in ("driving", "walking", "cycling")}
+_VERB_TRANSPORT_MODES = {
+    "walk": _TRANSPORT_MODES["walking"], "walking": _TRANSPORT_MODES["walking"],
+    "drive": _TRANSPORT_MODES["driving"], "driving": _TRANSPORT_MODES["driving"],
+}
+
+# Opt-in: load the embedding model, tag index and tag metadata in the background at
+# construction. Off by default so short-lived extractors (e.g. BatchExtractor's) stay lazy;
+# the API server calls warm() itself at startup.
+EXTRACTOR_WARM_ON_INIT = os.getenv("EXTRACTOR_WARM_ON_INIT", "0") == "1"
+
+EXTRACTOR_CACHE_ENABLED = os.getenv("EXTRACTOR_CACHE", "0") == "1"
+EXTRACTOR_CACHE_SIZE = int(os.getenv("EXTRACTOR_CACHE_SIZE", "1024"))
+EXTRACTOR_CACHE_DIR = os.getenv(
+    "EXTRACTOR_CACHE_DIR", os.path.expanduser("~/.cache/detourist/llm_extractions")
+)
+
+# Semantic cache for steps 1-2: a prompt whose embedding is within cosine
+# EXTRACTOR_SEMANTIC_THRESHOLD of a recent one reuses its preferences and candidate
+# tags. Step 3 always runs, so origin/destination come from the prompt itself.
+EXTRACTOR_SEMANTIC_CACHE_ENABLED = os.getenv("EXTRACTOR_SEMANTIC_CACHE", "0") == "1"
+EXTRACTOR_SEMANTIC_CACHE_SIZE = int(os.getenv("EXTRACTOR_SEMANTIC_CACHE_SIZE", "2048"))
+EXTRACTOR_SEMANTIC_THRESHOLD = float(os.getenv("EXTRACTOR_SEMANTIC_THRESHOLD", "0.92"))
+
+# Opt-in single round trip: FAISS candidates come from the raw prompt instead of step 1's
+# concepts, and one forced tool call returns the preferences together with the step-3
+# fields. Halves latency and cost per prompt; candidate recall is lower for long prompts.
+EXTRACTOR_SINGLE_CALL = os.getenv("EXTRACTOR_SINGLE_CALL", "0") == "1"
+
+DEFAULT_TRANSPORT_MODE = os.getenv("DEFAULT_TRANSPORT_MODE", "walking")
+MAX_WAYPOINT_QUERIES = 10
+
+
+# ----------------- Model output coercion -----------------
+# Each caster takes (raw value or None, default) and never raises, so malformed
+# model output degrades to defaults instead of failing the extraction.
+
+def _to_str(value: Any, default: str) -> str:
+    return value if isinstance(value, str) else default
+
+
+def _to_int(value: Any, default: Optional[int]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_mode(value: Any, default: str) -> str:
+    if not isinstance(value, str):
+        return default
+    return _TRANSPORT_MODES.get(value, value)
+
+
+_TRUE_STRINGS = frozenset({"true", "yes", "1"})
+
+
+def _to_bool(value: Any, default: bool) -> bool:
+    if value is True or value is False:
+        return value
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_STRINGS  # bool("false") would be True
+    return bool(value)
+
+
+def _to_tags(value: Any, default: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [q for q in value if isinstance(q, str) and q.strip()][:MAX_WAYPOINT_QUERIES]
+
+
+# field -> (accepted JSON keys in priority order, caster, default)
+_PARAMS_SCHEMA = {
+    "origin": (("origin", "origin_text"), _to_str, ""),
+    "destination": (("destination", "destination_text"), _to_str, ""),
+    "time_flexibility_minutes": (("time_flexibility_minutes",), _to_int, 10),
+    "waypoint_queries": (("waypoint_queries",), _to_tags, None),
+}
+_CONSTRAINTS_SCHEMA = {
+    "avoid_tolls": (("avoid_tolls",), _to_bool, False),
+    "avoid_stairs": (("avoid_stairs",), _to_bool, False),
+    "avoid_hills": (("avoid_hills",), _to_bool, False),
+    "avoid_highways": (("avoid_highways",), _to_bool, False),
+    "transport_mode": (("transport_mode",), _to_mode, _to_mode(DEFAULT_TRANSPORT_MODE, "walking")),
+}
+# Frozen all-defaults constraints, copied as-is when the model sent none
+_CONSTRAINT_DEFAULTS = MappingProxyType({k: default for k, (_, _, default) in _CONSTRAINTS_SCHEMA.items()})
+
+# Function schema for the single-call path: everything _create_extracted_parameters
+# reads, plus the preference concepts step 1 would have produced.
+_EXTRACT_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "extract_route_parameters",
+        "description": "Record the parameters of the user's route request.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "origin": {"type": "string"},
+                "destination": {"type": "string"},
+                "time_flexibility_minutes": {"type": "integer"},
+                "preferences": {
+                    "type": "string",
+                    "description": "Comma-separated preference concepts, e.g. \"parks, coffee shops\"",
+                },
+                "waypoint_queries": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "key=value tags chosen only from the candidate list",
+                },
+                "constraints": {
+                    "type": "object",
+                    "properties": {
+                        "avoid_tolls": {"type": "boolean"},
+                        "avoid_stairs": {"type": "boolean"},
+                        "avoid_hills": {"type": "boolean"},
+                        "avoid_highways": {"type": "boolean"},
+                        "transport_mode": {"type": "string", "enum": list(_TRANSPORT_MODES)},
+                    },
+                },
+            },
+            "required": ["origin", "destination", "preferences", "waypoint_queries"],
+        },
+    },
+}
+
+
+def _coerce(data: Dict[str, Any], keys: Tuple[str, ...], caster, default: Any) -> Any:
+    """First non-null value among `keys`, cast; the caster maps missing/bad values to `default`."""
+    value = None
+    for key in keys:
+        value = data.get(key)
+        if value is not None:
+            break
+    return caster(value, default)
+
+
+class _TopLevelJSONScanner:
+    """
+    Incremental scan of a streamed JSON object. Tracks string/nesting state across
+    fragments and records where the last complete top-level member ends, so
+    `buffer[:member_end] + "}"` is always a parseable prefix of the object.
+    """
+
+    __slots__ = ("buf", "member_end", "complete", "_pos", "_depth", "_in_string", "_escape")
+
+    def __init__(self):
+        self.buf = ""
+        self.member_end = -1
+        self.complete = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, fragment: str) -> bool:
+        """Append a fragment; True when it completed at least one new top-level member."""
+        self.buf += fragment
+        advanced = False
+        buf = self.buf
+        for pos in range(self._pos, len(buf)):
+            ch = buf[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self._depth:
+                    self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.member_end, self.complete, advanced = pos, True, True
+                    break
+            elif ch == "," and self._depth == 1:
+                self.member_end, advanced = pos, True
+        self._pos = len(buf)
+        return advanced
+
+    def parsed(self) -> Dict[str, Any]:
+        """Every complete top-level member received so far."""
+        start = self.buf.find("{")
+        if start < 0 or self.member_end < 0:
+            return {}
+        end = self.member_end + 1 if self.complete else self.member_end
+        return json_loads(self.buf[start:end] + ("" if self.complete else "}"))
+
+
+class _SemanticPreferenceCache:
+    """
+    Bounded LRU of normalized prompt -> (embedding, preferences, candidate tags).
+    Lookup is an exact dict hit first, then cosine top-1 over the stored unit vectors.
+    """
+
+    def __init__(self, dim: int, capacity: int, threshold: float):
+        self.threshold = threshold
+        self._vecs = np.zeros((capacity, dim), dtype=np.float32)
+        self._entries: List[Optional[Tuple[str, str, int, List[str]]]] = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._slots: Dict[str, int] = {}
+        self._size = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def _touch(self, slot: int) -> Tuple[str, str, int, List[str]]:
+        self._clock += 1
+        self._last_used[slot] = self._clock
+        return self._entries[slot]
 
+    def get_exact(self, key: str) -> Optional[Tuple[str, str, int, List[str]]]:
+        with self._lock:
+            slot = self._slots.get(key)
+            return self._touch(slot) if slot is not None else None
 
-@dataclass
+    def get_similar(self, vec: np.ndarray) -> Tuple[Optional[Tuple[str, str, int, List[str]]], float]:
+        """(entry, similarity) of the nearest stored prompt, entry None below threshold."""
+        with self._lock:
+            if not self._size:
+                return None, 0.0
+            sims = self._vecs[:self._size] @ vec
+            slot = int(np.argmax(sims))
+            score = float(sims[slot])
+            return (self._touch(slot) if score >= self.threshold else None), score
+
+    def put(self, key: str, vec: np.ndarray, preferences: str, num_tags: int, candidates: List[str]) -> None:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                if self._size < len(self._entries):
+                    slot = self._size
+                    self._size += 1
+                else:
+                    slot = int(np.argmin(self._last_used))
+                    del self._slots[self._entries[slot][0]]
+                self._slots[key] = slot
+            self._vecs[slot] = vec
+            self._entries[slot] = (key, preferences, num_tags, candidates)
+            self._touch(slot)
+
+
+@dataclass(slots=True, frozen=True)
 class ExtractedParameters:
     """
     Normalized parameters that the orchestrator expects.
+
+    Immutable and __dict__-free; callers copy `constraints` before changing it.
+    (Not hashable as a whole because of the list/dict fields.)
     """
     origin: str
     destination: str
@@ -44,6 +421,10 @@ class LLMExtractor:
       - OPENAI_MODEL   (defaults to gpt-4o-mini)
     """
 
+    # One FAISS validator (embedding model + index) per process, built on first use
+    _shared_validator: Optional[FAISSOSMTagValidator] = None
+    _validator_lock = threading.Lock()
+
     def __init__(self, llm_api_key: str = ""):
         # Prefer explicit key passed in, then env vars
         self.api_key = (
@@ -54,7 +435,6 @@ class LLMExtractor:
         if not self.api_key:
             logger.warning("[LLMExtractor] No API key set for OpenAI (OPENAI_API_KEY / LLM_API_KEY).")
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        self._validator = FAISSOSMTagValidator(include_descriptions_in_faiss_index=True)
 
         logger.info(
             "[LLMExtractor] Using OpenAI model=%s (key prefix=%s…)",
@@ -63,7 +443,45 @@ class LLMExtractor:
         )
 
         # Base URL for legacy-style HTTP API
-        self._base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+        # Invariant per instance: built once here, never per request
+        self._url = f"{self.base_url}/chat/completions"
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        # (expect_json, stream, tool) -> serialized body bytes before/after the prompt string
+        self._body_templates: Dict[Tuple[bool, bool, bool], Tuple[bytes, bytes]] = {}
+
+        # Pooled keep-alive session: avoids a fresh TCP+TLS handshake per call.
+        # Retries are handled in _call_openai (jittered backoff, honors Retry-After).
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({"Connection": "keep-alive"})
+
+        # Async client for extract_parameters_async (created lazily per event loop)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Extraction cache: hashed normalized prompt -> ExtractedParameters fields as JSON
+        self._cache_enabled = EXTRACTOR_CACHE_ENABLED
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._disk_cache = None
+        if self._cache_enabled and DISKCACHE_AVAILABLE:
+            try:
+                self._disk_cache = diskcache.Cache(EXTRACTOR_CACHE_DIR)
+            except Exception as e:
+                logger.warning("[LLMExtractor] Disk cache unavailable at %s: %s", EXTRACTOR_CACHE_DIR, e)
+
+        # Semantic steps 1-2 cache (built lazily: needs the validator's embedding model)
+        self._semantic_enabled = EXTRACTOR_SEMANTIC_CACHE_ENABLED
+        self._semantic_cache: Optional[_SemanticPreferenceCache] = None
+
+        if EXTRACTOR_WARM_ON_INIT:
+            threading.Thread(target=self.warm, name="llm-extractor-warm", daemon=True).start()
 
     # ----------------- Public API -----------------
 
@@ -76,44 +494,450 @@ class LLMExtractor:
           2) FAISS finds candidate OSM tags from those concepts.
           3) LLM receives the candidate list and returns STRICT JSON with origin/dest,
              time_flexibility_minutes, waypoint_queries (subset of candidates), constraints.
+
+        Bare "<origin> to <destination>" prompts skip the LLM entirely (see _parse_simple_prompt).
+        With EXTRACTOR_CACHE=1, results are cached by (model, normalized prompt, num_tags).
+        With EXTRACTOR_SINGLE_CALL=1, steps 1 and 3 are one tool call (see _EXTRACT_TOOL).
         """
+        simple = self._parse_simple_prompt(user_prompt)
+        if simple is not None:
+            return simple
+
+        cache_key, cached = self._lookup_cache(user_prompt, num_tags)
+        if cached is not None:
+            return cached
+
         try:
-            # Step 1: Preference concepts (plain text, comma separated)
-            pref_prompt = PREFERENCE_EXTRACTION_PROMPT.format(user_prompt=user_prompt)
-            preferences = self._call_openai_for_text(pref_prompt).strip()
-            if not preferences:
-                raise Exception("LLM returned empty preferences")
+            vec, hit = self._semantic_lookup(user_prompt, num_tags)
+            if hit is not None:
+                preferences, candidate_tag_strings = hit
+            else:
+                # Step 1: Preference concepts (plain text, comma separated)
+                preferences = self._keyword_preferences(user_prompt)
+                if preferences is None and EXTRACTOR_SINGLE_CALL:
+                    # Steps 1 and 3 in one tool call, candidates from the raw prompt
+                    extraction_prompt = self._candidate_extraction_prompt(user_prompt, user_prompt, num_tags)
+                    raw_json = self._call_openai(extraction_prompt, expect_json=True, tool=True)
+                    return self._finish_tool_extraction(raw_json, cache_key)
+                if preferences is None:
+                    pref_prompt = PREFERENCE_EXTRACTION_PROMPT.format(user_prompt=user_prompt)
+                    preferences = self._call_openai_for_text(pref_prompt).strip()
+                    if not preferences:
+                        raise Exception("LLM returned empty preferences")
 
-            # Step 2: FAISS lookup for candidate OSM tags based on those concepts
-            candidate_tags = self._validator.get_candidate_tags(preferences, top_k=max(10, num_tags * 4))
-            candidate_tag_strings = [f"{t.key}={t.value}" for t in candidate_tags]
+                # Step 2: FAISS lookup for candidate OSM tags based on those concepts
+                candidate_tag_strings = self._candidate_tag_strings(preferences, num_tags)
+                self._semantic_put(user_prompt, vec, preferences, num_tags, candidate_tag_strings)
+            extraction_prompt = create_extraction_prompt_with_candidates(user_prompt, candidate_tag_strings, num_tags)
 
             # Step 3: Strict JSON extraction using the hard candidate list
-            extraction_prompt = create_extraction_prompt_with_candidates(user_prompt, candidate_tag_strings, num_tags)
             raw_json = self._call_openai_for_json(extraction_prompt)
-            data = self._safe_json_parse(raw_json)
+            return self._finish_extraction(self._safe_json_parse(raw_json), preferences, cache_key)
+
+        except Exception as e:
+            logger.error("Error extracting parameters from prompt: %s", e, exc_info=True)
+            raise Exception(f"Failed to extract parameters: {e}")
+
+    async def extract_parameters_async(self, user_prompt: str, num_tags: int = 5) -> ExtractedParameters:
+        """
+        Async variant of extract_parameters (same pipeline, same cache).
+
+        OpenAI calls go through a shared httpx.AsyncClient and the FAISS lookup runs in a
+        worker thread, so a batch of prompts overlaps its network round trips:
+
+            results = await asyncio.gather(*(ex.extract_parameters_async(p) for p in prompts))
+        """
+        simple = self._parse_simple_prompt(user_prompt)
+        if simple is not None:
+            return simple
 
-            params = self._create_extracted_parameters(data, preferences)
-            logger.info("LLM extractor ok | origin=%s dest=%s tags=%s preferences=%s",
-                         params.origin, params.destination, params.waypoint_queries, params.preferences)
-            return params
+        cache_key, cached = self._lookup_cache(user_prompt, num_tags)
+        if cached is not None:
+            return cached
+
+        try:
+            vec, hit = await asyncio.to_thread(self._semantic_lookup, user_prompt, num_tags)
+            if hit is not None:
+                preferences, candidate_tag_strings = hit
+            else:
+                preferences = self._keyword_preferences(user_prompt)
+                if preferences is None and EXTRACTOR_SINGLE_CALL:
+                    extraction_prompt = await asyncio.to_thread(
+                        self._candidate_extraction_prompt, user_prompt, user_prompt, num_tags
+                    )
+                    raw_json = await self._call_openai_async(extraction_prompt, expect_json=True, tool=True)
+                    return self._finish_tool_extraction(raw_json, cache_key)
+                if preferences is None:
+                    pref_prompt = PREFERENCE_EXTRACTION_PROMPT.format(user_prompt=user_prompt)
+                    preferences = (await self._call_openai_async(pref_prompt, expect_json=False)).strip()
+                    if not preferences:
+                        raise Exception("LLM returned empty preferences")
+
+                candidate_tag_strings = await asyncio.to_thread(self._candidate_tag_strings, preferences, num_tags)
+                self._semantic_put(user_prompt, vec, preferences, num_tags, candidate_tag_strings)
+            extraction_prompt = create_extraction_prompt_with_candidates(user_prompt, candidate_tag_strings, num_tags)
+
+            raw_json = await self._call_openai_async(extraction_prompt, expect_json=True)
+            return self._finish_extraction(self._safe_json_parse(raw_json), preferences, cache_key)
 
         except Exception as e:
             logger.error("Error extracting parameters from prompt: %s", e, exc_info=True)
             raise Exception(f"Failed to extract parameters: {e}")
 
-    # ----------------- OpenAI helpers -----------------
+    async def extract_parameters_streaming(
+        self, user_prompt: str, num_tags: int = 5
+    ) -> AsyncIterator[Tuple[ExtractedParameters, FrozenSet[str]]]:
+        """
+        Like extract_parameters_async, but streams the step-3 answer (SSE) and yields
+        (params, received_fields) each time another top-level field has fully arrived.
+        Fields not yet in `received_fields` hold defaults; the last item yielded is the
+        final result (all fields received, cached like extract_parameters).
 
-    def _call_openai_for_text(self, prompt: str) -> str:
+            async for params, received in extractor.extract_parameters_streaming(prompt):
+                if "origin" in received: start_geocoding(params.origin)
         """
-        Call OpenAI chat completions and return plain text response.
-        Used for preference extraction (step 1).
+        simple = self._parse_simple_prompt(user_prompt)
+        if simple is None:
+            cache_key, simple = self._lookup_cache(user_prompt, num_tags)
+        if simple is not None:
+            yield simple, frozenset(_PARAMS_SCHEMA) | {"constraints"}
+            return
+
+        try:
+            vec, hit = await asyncio.to_thread(self._semantic_lookup, user_prompt, num_tags)
+            if hit is not None:
+                preferences, candidate_tag_strings = hit
+            else:
+                preferences = self._keyword_preferences(user_prompt)
+                if preferences is None:
+                    pref_prompt = PREFERENCE_EXTRACTION_PROMPT.format(user_prompt=user_prompt)
+                    preferences = (await self._call_openai_async(pref_prompt, expect_json=False)).strip()
+                    if not preferences:
+                        raise Exception("LLM returned empty preferences")
+
+                candidate_tag_strings = await asyncio.to_thread(self._candidate_tag_strings, preferences, num_tags)
+                self._semantic_put(user_prompt, vec, preferences, num_tags, candidate_tag_strings)
+            extraction_prompt = create_extraction_prompt_with_candidates(user_prompt, candidate_tag_strings, num_tags)
+
+            scanner = _TopLevelJSONScanner()
+            async with aclosing(self._stream_openai_async(extraction_prompt, expect_json=True)) as fragments:
+                async for fragment in fragments:
+                    if scanner.feed(fragment) and not scanner.complete:
+                        data = scanner.parsed()
+                        yield self._create_extracted_parameters(data, preferences), frozenset(data)
+                    if scanner.complete:
+                        break
+            # A truncated stream leaves the scanner incomplete: parse what arrived, as extract_parameters would
+            data = scanner.parsed() if scanner.complete else self._safe_json_parse(scanner.buf)
+            final = self._finish_extraction(data, preferences, cache_key)
+        except Exception as e:
+            logger.error("Error extracting parameters from prompt: %s", e, exc_info=True)
+            raise Exception(f"Failed to extract parameters: {e}")
+
+        yield final, frozenset(data)
+
+    def warm(self) -> None:
+        """Load the shared FAISS validator (model, index, tag metadata) now instead of on first use."""
+        started = time.perf_counter()
+        try:
+            self._get_validator().warm()
+        except Exception as e:
+            logger.warning("[LLMExtractor] Validator warm-up failed (will retry on first use): %s", e)
+            return
+        logger.info("[LLMExtractor] Validator warm in %.1fs", time.perf_counter() - started)
+
+    def extract_parameters_many(self, user_prompts: List[str], num_tags: int = 5) -> List[ExtractedParameters]:
         """
-        if not self.api_key:
-            raise RuntimeError(
-                "No OpenAI API key configured. Set OPENAI_API_KEY or LLM_API_KEY."
+        Extract parameters for several prompts, packing up to EXTRACTOR_BATCH_SIZE of them
+        into each OpenAI request: 2 round trips per batch instead of 2 per prompt.
+
+        Results are in input order. Simple prompts and cache hits never reach the LLM; a
+        prompt the batched answer doesn't cover falls back to extract_parameters.
+        """
+        results: List[Optional[ExtractedParameters]] = [None] * len(user_prompts)
+        pending: List[Tuple[int, Optional[str]]] = []
+        for i, user_prompt in enumerate(user_prompts):
+            simple = self._parse_simple_prompt(user_prompt)
+            if simple is not None:
+                results[i] = simple
+                continue
+            cache_key, cached = self._lookup_cache(user_prompt, num_tags)
+            if cached is not None:
+                results[i] = cached
+                continue
+            pending.append((i, cache_key))
+
+        for start in range(0, len(pending), EXTRACTOR_BATCH_SIZE):
+            self._extract_batch(user_prompts, pending[start:start + EXTRACTOR_BATCH_SIZE], num_tags, results)
+        return results
+
+    # Request/response pieces of the pipeline, for callers that send the requests
+    # themselves (e.g. BatchExtractor)
+
+    def preference_request_body(self, user_prompt: str) -> Dict[str, Any]:
+        """Chat completions body for step 1 (preference concepts)."""
+        return self._chat_body(PREFERENCE_EXTRACTION_PROMPT.format(user_prompt=user_prompt), expect_json=False)
+
+    def extraction_request_body(self, user_prompt: str, preferences: str, num_tags: int = 5) -> Dict[str, Any]:
+        """Chat completions body for steps 2-3 (FAISS candidates for `preferences`, strict JSON)."""
+        return self._chat_body(self._candidate_extraction_prompt(user_prompt, preferences, num_tags), expect_json=True)
+
+    def response_content(self, response_body: Dict[str, Any]) -> str:
+        """Message content of a chat completions response body."""
+        return self._content_from_response(response_body)
+
+    def parameters_from_content(self, content: str, preferences: str) -> ExtractedParameters:
+        """ExtractedParameters from a step-3 answer; raises ValueError if it holds no JSON object."""
+        return self._create_extracted_parameters(self._safe_json_parse(content), preferences)
+
+    def close(self) -> None:
+        """Release pooled HTTP connections."""
+        self._session.close()
+
+    async def aclose(self) -> None:
+        """Release pooled HTTP connections, including the async client."""
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    # ----------------- Pipeline steps -----------------
+
+    def _parse_simple_prompt(self, user_prompt: str) -> Optional[ExtractedParameters]:
+        """
+        Parse prompts like "Brooklyn to Times Square" or "walk from A to B" locally.
+        Returns None (use the LLM) for anything carrying preferences or extra detail.
+        """
+        if not SMART_ROUTING_ENABLED or len(user_prompt) >= SIMPLE_PROMPT_MAX_CHARS:
+            return None
+        m = _SIMPLE_PROMPT_RE.match(user_prompt)
+        if not m:
+            logger.info("LLM extractor routing=llm (not a bare origin/destination prompt)")
+            return None
+        origin = m.group("origin").strip(" ,.")
+        destination = m.group("destination").strip(" ,.")
+        for part in (origin, destination):
+            words = _PROMPT_WORD_RE.findall(part.lower())
+            if not words or _DETOUR_HINT_WORDS.intersection(words):
+                logger.info("LLM extractor routing=llm (prompt has preferences/details)")
+                return None
+            if len(words) == 1 and (part.islower() or words[0] in _COMMON_ENDPOINT_WORDS):
+                logger.info("LLM extractor routing=llm (endpoint is not a specific place)")
+                return None
+
+        constraints: Dict[str, Any] = {}
+        verb = (m.group("verb") or "").lower()
+        if verb:
+            constraints["transport_mode"] = _VERB_TRANSPORT_MODES[verb]
+        params = self._create_extracted_parameters(
+            {"origin": origin, "destination": destination, "constraints": constraints}, preferences=""
+        )
+        logger.info("LLM extractor routing=local | origin=%s dest=%s", params.origin, params.destination)
+        return params
+
+    def _keyword_preferences(self, user_prompt: str) -> Optional[str]:
+        """
+        Return the prompt itself as the preference string when it is already a short
+        comma-separated concept list; None means step 1 should ask the LLM.
+        """
+        if (
+            KEYWORD_PREFERENCES_ENABLED
+            and len(user_prompt) < KEYWORD_PROMPT_MAX_CHARS
+            and user_prompt.count(",") >= 1
+            and not _VERB_RE.search(user_prompt)
+        ):
+            logger.info("LLM extractor step1=local (prompt is a keyword list)")
+            return user_prompt.strip()
+        logger.debug("LLM extractor step1=llm")
+        return None
+
+    @classmethod
+    def _get_validator(cls) -> FAISSOSMTagValidator:
+        if cls._shared_validator is None:
+            with cls._validator_lock:
+                if cls._shared_validator is None:
+                    cls._shared_validator = FAISSOSMTagValidator(include_descriptions_in_faiss_index=True)
+        return cls._shared_validator
+
+    def _lookup_cache(self, user_prompt: str, num_tags: int) -> Tuple[Optional[str], Optional[ExtractedParameters]]:
+        """Return (cache_key, cached parameters or None); key is None when caching is off."""
+        if not self._cache_enabled:
+            return None, None
+        cache_key = self._cache_key(user_prompt, num_tags)
+        cached = self._cache_get(cache_key)
+        if cached is None:
+            return cache_key, None
+        logger.info("LLM extractor cache hit | key=%s", cache_key[:12])
+        return cache_key, ExtractedParameters(**cached)
+
+    def _candidate_tag_strings(self, preferences: str, num_tags: int) -> List[str]:
+        """Step 2: FAISS candidate OSM tags ("key=value") for the preference concepts."""
+        candidate_tags = self._get_validator().get_candidate_tags(preferences, top_k=max(10, num_tags * 4))
+        return [f"{t.key}={t.value}" for t in candidate_tags]
+
+    def _candidate_extraction_prompt(self, user_prompt: str, preferences: str, num_tags: int) -> str:
+        """Steps 2-3 prep: FAISS candidate tags for the preferences -> strict JSON prompt."""
+        candidate_tag_strings = self._candidate_tag_strings(preferences, num_tags)
+        return create_extraction_prompt_with_candidates(user_prompt, candidate_tag_strings, num_tags)
+
+    # ----------------- Semantic steps 1-2 cache -----------------
+
+    def _get_semantic_cache(self) -> Optional[_SemanticPreferenceCache]:
+        if self._semantic_cache is None and self._semantic_enabled:
+            db = self._get_validator().db
+            if db.embedding_model is None:
+                logger.warning("[LLMExtractor] Semantic cache disabled: no embedding model available")
+                self._semantic_enabled = False
+                return None
+            self._semantic_cache = _SemanticPreferenceCache(
+                db.embedding_dim, EXTRACTOR_SEMANTIC_CACHE_SIZE, EXTRACTOR_SEMANTIC_THRESHOLD
             )
+        return self._semantic_cache
+
+    def _semantic_lookup(
+        self, user_prompt: str, num_tags: int
+    ) -> Tuple[Optional[np.ndarray], Optional[Tuple[str, List[str]]]]:
+        """
+        (prompt embedding, (preferences, candidate tags) or None). The embedding is None
+        when the cache is off or the prompt was an exact hit (nothing new to store).
+        """
+        cache = self._get_semantic_cache()
+        if cache is None:
+            return None, None
+        key = " ".join(user_prompt.lower().split())
+        entry = cache.get_exact(key)
+        vec = None
+        if entry is None:
+            vec = self._get_validator().db._encode([user_prompt], normalize_embeddings=True)[0]
+            entry, score = cache.get_similar(vec)
+            if entry is None:
+                return vec, None
+            logger.info("LLM extractor semantic hit | sim=%.3f matched=%r", score, entry[0])
+        _, preferences, cached_num_tags, candidates = entry
+        if cached_num_tags != num_tags:
+            candidates = self._candidate_tag_strings(preferences, num_tags)
+        return vec, (preferences, candidates)
 
+    def _semantic_put(
+        self, user_prompt: str, vec: Optional[np.ndarray], preferences: str, num_tags: int, candidates: List[str]
+    ) -> None:
+        if vec is not None and self._semantic_cache is not None:
+            key = " ".join(user_prompt.lower().split())
+            self._semantic_cache.put(key, vec, preferences, num_tags, candidates)
+
+    def _extract_batch(
+        self,
+        user_prompts: List[str],
+        batch: List[Tuple[int, Optional[str]]],
+        num_tags: int,
+        results: List[Optional[ExtractedParameters]],
+    ) -> None:
+        """Run steps 1-3 for one batch of (index, cache_key), filling `results` in place."""
+        prompts = [user_prompts[i] for i, _ in batch]
+        preferences: List[Any] = []
+        rows: List[Any] = []
+        try:
+            raw = self._call_openai_for_json(
+                create_preference_batch_prompt(prompts),
+                max_tokens=PREFERENCE_MAX_TOKENS_PER_TASK * len(prompts),
+            )
+            preferences = self._batch_results(raw, len(prompts))
+            # Tasks with unusable preferences are left to the single-prompt fallback below
+            tasks = [
+                k for k, p in enumerate(preferences) if isinstance(p, str) and p.strip()
+            ]
+            if tasks:
+                candidates = [self._candidate_tag_strings(preferences[k].strip(), num_tags) for k in tasks]
+                raw = self._call_openai_for_json(
+                    create_batch_extraction_prompt_with_candidates(
+                        [prompts[k] for k in tasks], candidates, num_tags
+                    ),
+                    max_tokens=OPENAI_JSON_MAX_TOKENS * len(tasks),
+                )
+                task_rows = self._batch_results(raw, len(tasks))
+                rows = [None] * len(prompts)
+                for k, row in zip(tasks, task_rows):
+                    rows[k] = row
+        except Exception as e:
+            logger.warning("[LLMExtractor] Batched extraction failed (%s); falling back per prompt", e)
+            rows = []
+
+        for k, (i, cache_key) in enumerate(batch):
+            row = rows[k] if k < len(rows) else None
+            if isinstance(row, dict):
+                results[i] = self._finish_extraction(row, preferences[k].strip(), cache_key)
+            else:
+                results[i] = self.extract_parameters(user_prompts[i], num_tags)
+
+    def _batch_results(self, raw_json: str, expected: int) -> List[Any]:
+        """The "results" array of a batched answer, padded/truncated to `expected` entries."""
+        data = self._safe_json_parse(raw_json)
+        items = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            raise ValueError("batched response has no results array")
+        if len(items) != expected:
+            logger.warning("[LLMExtractor] Batched response has %d results for %d tasks", len(items), expected)
+        return (items + [None] * expected)[:expected]
+
+    def _finish_extraction(
+        self, data: Dict[str, Any], preferences: str, cache_key: Optional[str]
+    ) -> ExtractedParameters:
+        params = self._create_extracted_parameters(data, preferences)
+        logger.info("LLM extractor ok | origin=%s dest=%s tags=%s preferences=%s",
+                     params.origin, params.destination, params.waypoint_queries, params.preferences)
+        if cache_key is not None:
+            self._cache_put(cache_key, asdict(params))
+        return params
+
+    def _finish_tool_extraction(self, raw_json: str, cache_key: Optional[str]) -> ExtractedParameters:
+        """Single-call path: the tool arguments carry the preferences next to the step-3 fields."""
+        data = self._safe_json_parse(raw_json)
+        preferences = _to_str(data.pop("preferences", None), "")
+        return self._finish_extraction(data, preferences, cache_key)
+
+    # ----------------- Extraction cache -----------------
+
+    def _cache_key(self, user_prompt: str, num_tags: int) -> str:
+        normalized_prompt = " ".join(user_prompt.lower().split())
+        raw = f"{self.model}|{num_tags}|{normalized_prompt}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            raw = self._cache.get(key)
+            if raw is not None:
+                self._cache.move_to_end(key)
+        if raw is None and self._disk_cache is not None:
+            try:
+                raw = self._disk_cache.get(key)
+            except Exception as e:
+                logger.warning("[LLMExtractor] Disk cache read failed: %s", e)
+            if raw is not None:
+                self._remember(key, raw)
+        # Decode on every hit so callers never share mutable lists/dicts
+        return json_loads(raw) if raw is not None else None
+
+    def _cache_put(self, key: str, value: Dict[str, Any]) -> None:
+        raw = json_dumps(value)
+        self._remember(key, raw)
+        if self._disk_cache is not None:
+            try:
+                self._disk_cache.set(key, raw)
+            except Exception as e:
+                logger.warning("[LLMExtractor] Disk cache write failed: %s", e)
+
+    def _remember(self, key: str, raw: bytes) -> None:
+        with self._cache_lock:
+            self._cache[key] = raw
+            self._cache.move_to_end(key)
+            while len(self._cache) > EXTRACTOR_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    # ----------------- OpenAI helpers -----------------
+
+    def _chat_body(
+        self, prompt: str, expect_json: bool, max_tokens: Optional[int] = None, tool: bool = False
+    ) -> Dict[str, Any]:
         body: Dict[str, Any] = {
             "model": self.model,
             "messages": [
@@ -121,33 +945,52 @@ class LLMExtractor:
             ],
             "temperature": 0.1,
         }
+        if tool:
+            # Arguments of a forced _EXTRACT_TOOL call stand in for the JSON content
+            body["tools"] = [_EXTRACT_TOOL]
+            body["tool_choice"] = "required"
+            body["max_tokens"] = max_tokens or OPENAI_JSON_MAX_TOKENS + PREFERENCE_MAX_TOKENS_PER_TASK
+            body["seed"] = OPENAI_SEED
+        elif expect_json:
+            body["response_format"] = {"type": "json_object"}
+            body["max_tokens"] = max_tokens or OPENAI_JSON_MAX_TOKENS
+            body["stop"] = ["\n\n\n"]
+            body["seed"] = OPENAI_SEED
+        return body
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
-        url = f"{self._base_url}/chat/completions"
-        resp = requests.post(url, headers=headers, json=body, timeout=40)
-        try:
-            resp.raise_for_status()
-        except Exception as e:
-            text = None
-            try:
-                text = resp.text
-            except Exception:
-                pass
-            logger.error(
-                "[LLMExtractor] OpenAI HTTP error: %s (status=%s, body=%r)",
-                e,
-                resp.status_code,
-                text,
-            )
-            raise
+    def _chat_payload(
+        self,
+        prompt: str,
+        expect_json: bool,
+        max_tokens: Optional[int] = None,
+        stream: bool = False,
+        tool: bool = False,
+    ) -> bytes:
+        """
+        Serialized request body. Everything but the prompt is fixed per instance, so the
+        bytes around it are encoded once per (expect_json, stream) and only the prompt
+        string is serialized per call.
+        """
+        if max_tokens is not None:
+            body = self._chat_body(prompt, expect_json, max_tokens, tool)
+            if stream:
+                body["stream"] = True
+            return json_dumps(body)
+        template = self._body_templates.get((expect_json, stream, tool))
+        if template is None:
+            body = self._chat_body(_PROMPT_SENTINEL, expect_json, tool=tool)
+            if stream:
+                body["stream"] = True
+            prefix, suffix = json_dumps(body).split(json_dumps(_PROMPT_SENTINEL))
+            template = self._body_templates[(expect_json, stream, tool)] = (prefix, suffix)
+        return template[0] + json_dumps(prompt) + template[1]
 
-        js = resp.json()
+    def _content_from_response(self, js: Dict[str, Any], tool: bool = False) -> str:
         try:
-            content = js["choices"][0]["message"]["content"]
+            message = js["choices"][0]["message"]
+            if tool:
+                return message["tool_calls"][0]["function"]["arguments"]
+            return message["content"]
         except Exception as e:
             logger.error(
                 "[LLMExtractor] Unexpected OpenAI response format: %s (json=%r)",
@@ -156,36 +999,56 @@ class LLMExtractor:
             )
             raise RuntimeError("Unexpected response format from OpenAI.")
 
-        return content.strip()
+    def _call_openai_for_text(self, prompt: str) -> str:
+        """
+        Call OpenAI chat completions and return plain text response.
+        Used for preference extraction (step 1).
+        """
+        return self._call_openai(prompt, expect_json=False).strip()
 
-    def _call_openai_for_json(self, prompt: str) -> str:
+    def _call_openai_for_json(self, prompt: str, max_tokens: Optional[int] = None) -> str:
         """
         Call OpenAI chat completions and request a strict JSON response.
 
         Uses the "response_format": {"type": "json_object"} contract supported
         by the newer GPT-4o family models.
         """
+        return self._call_openai(prompt, expect_json=True, max_tokens=max_tokens)
+
+    def _call_openai(
+        self, prompt: str, expect_json: bool, max_tokens: Optional[int] = None, tool: bool = False
+    ) -> str:
         if not self.api_key:
             raise RuntimeError(
                 "No OpenAI API key configured. Set OPENAI_API_KEY or LLM_API_KEY."
             )
 
-        body: Dict[str, Any] = {
-            "model": self.model,
-            "messages": [
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0.1,
-            "response_format": {"type": "json_object"},
-        }
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        payload = self._chat_payload(prompt, expect_json, max_tokens, tool=tool)
+        for attempt in range(OPENAI_MAX_ATTEMPTS):
+            last_attempt = attempt + 1 >= OPENAI_MAX_ATTEMPTS
+            try:
+                resp = self._session.post(
+                    self._url, headers=self._headers, data=payload, timeout=40, stream=True
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning("[LLMExtractor] OpenAI request failed (%s); retrying in %.1fs", e, delay)
+                time.sleep(delay)
+                continue
+            if resp.status_code in OPENAI_RETRY_STATUSES and not last_attempt:
+                retry_after = resp.headers.get("Retry-After")
+                delay = _retry_delay(attempt, retry_after)
+                logger.warning(
+                    "[LLMExtractor] OpenAI status=%s (Retry-After=%s); retrying in %.1fs",
+                    resp.status_code, retry_after, delay,
+                )
+                resp.close()
+                time.sleep(delay)
+                continue
+            break
 
-        url = f"{self._base_url}/chat/completions"
-        resp = requests.post(url, headers=headers, json=body, timeout=40)
         try:
             resp.raise_for_status()
         except Exception as e:
@@ -203,64 +1066,156 @@ class LLMExtractor:
             )
             raise
 
-        js = resp.json()
+        return self._content_from_response(_read_json_stream(resp), tool)
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # httpx pools are bound to the event loop they were first used on
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                http2=OPENAI_HTTP2,
+                timeout=40,
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                ),
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def _call_openai_async(self, prompt: str, expect_json: bool, tool: bool = False) -> str:
+        if not self.api_key:
+            raise RuntimeError(
+                "No OpenAI API key configured. Set OPENAI_API_KEY or LLM_API_KEY."
+            )
+
+        client = self._get_async_client()
+        payload = self._chat_payload(prompt, expect_json, tool=tool)
+        for attempt in range(OPENAI_MAX_ATTEMPTS):
+            last_attempt = attempt + 1 >= OPENAI_MAX_ATTEMPTS
+            try:
+                resp = await client.post(self._url, headers=self._headers, content=payload)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning("[LLMExtractor] OpenAI request failed (%s); retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+                continue
+            if resp.status_code in OPENAI_RETRY_STATUSES and not last_attempt:
+                retry_after = resp.headers.get("Retry-After")
+                delay = _retry_delay(attempt, retry_after)
+                logger.warning(
+                    "[LLMExtractor] OpenAI status=%s (Retry-After=%s); retrying in %.1fs",
+                    resp.status_code, retry_after, delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+            break
+
         try:
-            content = js["choices"][0]["message"]["content"]
-        except Exception as e:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
             logger.error(
-                "[LLMExtractor] Unexpected OpenAI response format: %s (json=%r)",
+                "[LLMExtractor] OpenAI HTTP error: %s (status=%s, body=%r)",
                 e,
-                js,
+                resp.status_code,
+                resp.text,
             )
-            raise RuntimeError("Unexpected response format from OpenAI.")
+            raise
+
+        content = self._content_from_response(json_loads(resp.content), tool)
+        return content if expect_json else content.strip()
+
+    async def _stream_openai_async(self, prompt: str, expect_json: bool) -> AsyncIterator[str]:
+        """Yield content deltas of a streamed (SSE) chat completion. Retries happen only before the first byte."""
+        if not self.api_key:
+            raise RuntimeError(
+                "No OpenAI API key configured. Set OPENAI_API_KEY or LLM_API_KEY."
+            )
+
+        client = self._get_async_client()
+        payload = self._chat_payload(prompt, expect_json, stream=True)
+        streamed = False
+        for attempt in range(OPENAI_MAX_ATTEMPTS):
+            last_attempt = attempt + 1 >= OPENAI_MAX_ATTEMPTS
+            try:
+                async with client.stream("POST", self._url, headers=self._headers, content=payload) as resp:
+                    if resp.status_code in OPENAI_RETRY_STATUSES and not last_attempt:
+                        retry_after = resp.headers.get("Retry-After")
+                        delay = _retry_delay(attempt, retry_after)
+                        logger.warning(
+                            "[LLMExtractor] OpenAI status=%s (Retry-After=%s); retrying in %.1fs",
+                            resp.status_code, retry_after, delay,
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+                    if resp.is_error:
+                        await resp.aread()
+                        logger.error(
+                            "[LLMExtractor] OpenAI HTTP error: status=%s, body=%r",
+                            resp.status_code,
+                            resp.text,
+                        )
+                        resp.raise_for_status()
 
-        return content
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue  # blank separators / SSE comments
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            return
+                        choices = json_loads(data).get("choices") or []
+                        delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                        if delta:
+                            streamed = True
+                            yield delta
+                    return
+            except httpx.TransportError as e:
+                if last_attempt or streamed:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning("[LLMExtractor] OpenAI request failed (%s); retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
 
     def _create_extracted_parameters(self, data: Dict[str, Any], preferences: str) -> ExtractedParameters:
         """
         Create ExtractedParameters from parsed JSON data and preferences string.
         """
-        constraints = data.get("constraints", {}) or {}
-        if not isinstance(constraints, dict):
-            constraints = {}
-
-        wq = [q for q in data.get("waypoint_queries", []) if isinstance(q, str) and q.strip()]
-        
-        return ExtractedParameters(
-            origin=data.get("origin", ""),
-            destination=data.get("destination", ""),
-            time_flexibility_minutes=int(data.get("time_flexibility_minutes", 10)),
-            waypoint_queries=wq[:10],
-            constraints={
-                "avoid_tolls": bool(constraints.get("avoid_tolls", False)),
-                "avoid_stairs": bool(constraints.get("avoid_stairs", False)),
-                "avoid_hills": bool(constraints.get("avoid_hills", False)),
-                "avoid_highways": bool(constraints.get("avoid_highways", False)),
-                "transport_mode": constraints.get("transport_mode", os.getenv("DEFAULT_TRANSPORT_MODE", "walking")),
-            },
-            preferences=preferences,
-        )
+        if not isinstance(data, dict):
+            data = {}
+        raw_constraints = data.get("constraints")
+
+        fields = {k: _coerce(data, keys, caster, default) for k, (keys, caster, default) in _PARAMS_SCHEMA.items()}
+        if raw_constraints and isinstance(raw_constraints, dict):
+            constraints = {
+                k: _coerce(raw_constraints, keys, caster, default)
+                for k, (keys, caster, default) in _CONSTRAINTS_SCHEMA.items()
+            }
+        else:
+            constraints = dict(_CONSTRAINT_DEFAULTS)
+        return ExtractedParameters(**fields, constraints=constraints, preferences=preferences)
 
     def _safe_json_parse(self, s: str) -> Dict[str, Any]:
         """
-        Parse JSON from the model. If the model wrapped it in markdown fences,
-        strip them first.
+        Parse JSON from the model. Markdown fences or stray prose around the object
+        are dropped by slicing from the first "{" to the last "}" (two C-level scans);
+        if trailing prose has braces too, the first balanced object is used instead.
         """
-        s = s.strip()
-        # Strip ```json ... ``` if present
-        if s.startswith("```"):
-            lines = s.splitlines()
-            # drop first and last fence lines
-            inner = []
-            for line in lines:
-                if line.strip().startswith("```"):
-                    continue
-                inner.append(line)
-            s = "\n".join(inner).strip()
+        start = s.find("{")
+        end = s.rfind("}")
+        if 0 <= start < end:
+            s = s[start:end + 1]
 
         try:
-            return json.loads(s)
-        except Exception as e:
+            return json_loads(s)
+        except ValueError as e:
+            balanced = extract_json_span(s)
+            if balanced is not None and balanced != s:
+                try:
+                    return json_loads(balanced)
+                except ValueError:
+                    pass
             logger.error("[LLMExtractor] Failed to parse JSON from model: %s; raw=%r", e, s)
             raise
 
@@ -10,33 +10,257 @@ Environment variables used:
 """
 
 from __future__ import annotations
-from abc import ABC, abstractmethod
-from typing import Optional, List
-import requests
-import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional, List, Protocol, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+import asyncio
+import hashlib
 import logging
 import os
+import random
+import threading
+import time
+import weakref
 
+import httpx
+import urllib3
 
-class LLMProvider(ABC):
-    """Abstract base class for LLM providers."""
+from backend.json_utils import extract_json_span, json_dumps, json_loads
+
+# One process-wide connection pool for every provider. Retries cover connection
+# failures only (POST is not idempotent, so read errors and statuses are not retried).
+_POOL = urllib3.PoolManager(
+    maxsize=32,
+    retries=urllib3.Retry(total=3, backoff_factor=0.2, raise_on_status=False),
+)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Provider selection (see module docstring), read once at import
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama").lower()
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b-instruct-q4_K_M")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# Ollama generation has no side effects, so its POSTs may also be retried when the
+# server is busy or restarting (503 while a model loads, 502/504 behind a proxy).
+# Read errors are never retried: a read timeout on a 300s generate would otherwise
+# repeat, and read=False re-raises it as-is so callers still see a TimeoutError.
+_OLLAMA_RETRY = urllib3.Retry(
+    total=2,
+    read=False,
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=None,
+    raise_on_status=False,
+)
+
+# Ollama availability is probed on every candidate base URL at once and the
+# answer (either way) is reused for this long.
+OLLAMA_PROBE_TIMEOUT_S = 2.0
+OLLAMA_PROBE_DEADLINE_S = 3.0
+# After a timeout/connection failure, calls fail fast for this long instead of each
+# waiting out its own timeout while Ollama is down or loading a model.
+OLLAMA_FAILURE_COOLDOWN_S = 5.0
+OLLAMA_AVAILABILITY_TTL_S = 60.0
+
+def _post_json(
+    url: str, payload: dict, headers: dict, timeout: float, retries: Optional[urllib3.Retry] = None
+) -> urllib3.BaseHTTPResponse:
+    kwargs = {"retries": retries} if retries is not None else {}
+    return _POOL.request("POST", url, body=json_dumps(payload), headers=headers, timeout=timeout, **kwargs)
+
+
+class RateLimitError(Exception):
+    """HTTP 429 from a provider; `retry_after` is the server's hint in seconds, if any."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None  # HTTP-date form
+
+
+# model -> (requests/min, tokens/min) as reported by OpenAI's x-ratelimit-limit-* headers
+_RATE_LIMITS: Dict[str, Tuple[int, int]] = {}
+
+
+def _remember_rate_limits(model: str, headers: Any) -> None:
+    try:
+        rpm = int(headers.get("x-ratelimit-limit-requests") or 0)
+        tpm = int(headers.get("x-ratelimit-limit-tokens") or 0)
+    except ValueError:
+        return
+    if rpm and tpm:
+        _RATE_LIMITS[model] = (rpm, tpm)
+
+
+class _TokenBucket:
+    """Per-minute budget refilled continuously; acquire() waits until `amount` is available."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+
+    async def acquire(self, amount: float) -> None:
+        amount = min(float(amount), self.capacity)
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+# Generation budgets: the step-3 JSON is ~120 tokens and preferences a short line, so
+# the old 700-token cap was pure slack. Stops end JSON at a closing fence or blank run.
+OLLAMA_JSON_NUM_PREDICT = int(os.getenv("OLLAMA_JSON_NUM_PREDICT", "256"))
+OLLAMA_TEXT_NUM_PREDICT = int(os.getenv("OLLAMA_TEXT_NUM_PREDICT", "128"))
+OLLAMA_JSON_STOP = ["\n```", "\n\n\n"]
+
+# Ollama JSON generations are streamed (NDJSON) and cut off as soon as the first
+# top-level object closes, instead of waiting for num_predict tokens of padding.
+OLLAMA_STREAM_CHUNK_BYTES = 1024
+
+
+class _JSONObjectTracker:
+    """Incremental brace matcher over streamed text; feed() is True once the first object closes."""
+
+    __slots__ = ("depth", "in_string", "escape", "started")
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+
+    def feed(self, fragment: str) -> bool:
+        for c in fragment:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == "{":
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                continue  # prose before the object
+            elif c == '"':
+                self.in_string = True
+            elif c == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+def _iter_ndjson(chunks) -> Any:
+    """Decoded objects from an iterable of NDJSON byte chunks."""
+    buf = b""
+    for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json_loads(line)
+    if buf.strip():
+        yield json_loads(buf)
+
+
+# Process-wide LRU of successful responses keyed by (provider models, prompt, expect_json).
+# Prompts are deterministic templates at temperature 0.1, so repeats return cached text.
+# LLM_RESPONSE_CACHE_SIZE=0 disables it.
+RESPONSE_CACHE_SIZE = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "256"))
+_RESPONSE_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _response_cache_key(models: str, prompt: str, expect_json: bool) -> str:
+    raw = f"{models}\0{prompt}\0{expect_json}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _response_cache_get(key: str) -> Optional[str]:
+    if RESPONSE_CACHE_SIZE <= 0:
+        return None
+    with _RESPONSE_CACHE_LOCK:
+        text = _RESPONSE_CACHE.get(key)
+        if text is not None:
+            _RESPONSE_CACHE.move_to_end(key)
+        return text
+
+
+def _response_cache_put(key: str, text: str) -> None:
+    if RESPONSE_CACHE_SIZE <= 0:
+        return
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = text
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+def _finalize_text(text: str, expect_json: bool) -> str:
+    text = text.strip()
+    if not expect_json:
+        return text
+    # JSON mode replies are usually the bare object: one parse, no scanning
+    if text[:1] == "{" and text[-1:] == "}":
+        try:
+            json_loads(text)
+            return text
+        except ValueError:
+            pass
+    js = extract_json_span(text)
+    if js is not None:
+        return js
+    raise Exception("No JSON object found in LLM response")
+
+
+# Async clients are bound to the event loop they were created on: one per loop
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
 
-    def __init__(self, model_name: str):
-        self.model_name = model_name
-        self.logger = logging.getLogger(__name__)
 
-    @abstractmethod
+def _async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+    return client
+
+
+class LLMProvider(Protocol):
+    """What LLMProviderManager needs from a provider (matched structurally, no base class)."""
+
+    model_name: str
+
     def is_available(self) -> bool:
         """Return True if the provider can serve requests."""
         ...
 
-    @abstractmethod
     def extract_parameters(self, prompt: str, expect_json: bool = True) -> str:
         """Run the model and return either raw text or a JSON string."""
         ...
 
+    async def extract_parameters_async(self, prompt: str, expect_json: bool = True) -> str:
+        """Coroutine variant, using a native async HTTP call."""
+        ...
+
 
-class LlamaProvider(LLMProvider):
+class LlamaProvider:
     """
     Llama 3.1 provider via Ollama.
 
@@ -47,7 +271,8 @@ class LlamaProvider(LLMProvider):
     """
 
     def __init__(self, model_name: str = "llama3.1:8b-instruct-q4_K_M"):
-        super().__init__(model_name)
+        self.model_name = model_name
+        self.logger = logging.getLogger(__name__)
         base = os.getenv("OLLAMA_BASE_URL", "").strip().rstrip("/")
         self._candidates: List[str] = []
         if base:
@@ -58,91 +283,224 @@ class LlamaProvider(LLMProvider):
         ]
         self._generate_url: Optional[str] = None
         self._tags_url: Optional[str] = None
+        # (available, time.monotonic() of the probe)
+        self._avail_cache: Optional[Tuple[bool, float]] = None
+        self._avail_lock = threading.Lock()
+        self._cooldown_until = 0.0
 
     # ---------- internal ----------
 
+    def _invalidate_availability(self) -> None:
+        """
+        Forget the probed backend so the next call re-probes (it may have gone away),
+        and fail calls fast for OLLAMA_FAILURE_COOLDOWN_S meanwhile.
+        """
+        self._avail_cache = None
+        self._generate_url = None
+        self._cooldown_until = time.monotonic() + OLLAMA_FAILURE_COOLDOWN_S
+
+    def _check_cooldown(self) -> None:
+        remaining = self._cooldown_until - time.monotonic()
+        if remaining > 0:
+            raise Exception(f"Ollama cooldown after a failed call ({remaining:.1f}s left)")
+
     def _set_urls(self, base: str) -> None:
         base = base.rstrip("/")
         self._generate_url = f"{base}/api/generate"
         self._tags_url = f"{base}/api/tags"
 
-    # ---------- public ------------
+    def _probe(self, base: str) -> bool:
+        try:
+            r = _POOL.request("GET", f"{base}/api/tags", timeout=OLLAMA_PROBE_TIMEOUT_S, retries=False)
+            if r.status != 200:
+                self.logger.warning(f"[LLM] /api/tags non-200 at {base}: {r.status}")
+                return False
+            data = json_loads(r.data) if r.data else {"models": []}
+            models = [m.get("name", "") for m in data.get("models", [])]
+            if self.model_name in models:
+                return True
+            self.logger.warning(f"[LLM] Model {self.model_name} not listed at {base}. Found: {models}")
+        except Exception as e:
+            self.logger.warning(f"[LLM] probe failed at {base}: {e}")
+        return False
 
     def is_available(self) -> bool:
-        for base in self._candidates:
+        with self._avail_lock:
+            cached = self._avail_cache
+            if cached is not None and time.monotonic() - cached[1] < OLLAMA_AVAILABILITY_TTL_S:
+                return cached[0]
+
+            available = False
+            pool = ThreadPoolExecutor(max_workers=len(self._candidates))
             try:
-                self._set_urls(base)
-                r = requests.get(self._tags_url, timeout=6)
-                if r.status_code != 200:
-                    self.logger.warning(f"[LLM] /api/tags non-200 at {base}: {r.status_code}")
-                    continue
-                data = r.json() if r.content else {"models": []}
-                models = [m.get("name", "") for m in data.get("models", [])]
-                if self.model_name in models:
-                    self.logger.info(f"[LLM] Ollama OK at {base} w/ model {self.model_name}")
-                    return True
-                else:
-                    self.logger.warning(f"[LLM] Model {self.model_name} not listed at {base}. Found: {models}")
-            except Exception as e:
-                self.logger.warning(f"[LLM] probe failed at {base}: {e}")
-        return False
+                futures = {pool.submit(self._probe, base): base for base in self._candidates}
+                for fut in as_completed(futures, timeout=OLLAMA_PROBE_DEADLINE_S):
+                    if fut.result():
+                        base = futures[fut]
+                        self._set_urls(base)
+                        # Known-good base first, so it is also the first tried after expiry
+                        self._candidates = [base] + [c for c in self._candidates if c != base]
+                        self.logger.info(f"[LLM] Ollama OK at {base} w/ model {self.model_name}")
+                        available = True
+                        break
+            except FuturesTimeoutError:
+                self.logger.warning(f"[LLM] no Ollama candidate answered within {OLLAMA_PROBE_DEADLINE_S}s")
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+            self._avail_cache = (available, time.monotonic())
+            return available
+
+    # ---------- public ------------
 
     def extract_parameters(self, prompt: str, expect_json: bool = True) -> str:
+        self._check_cooldown()
         if not self._generate_url:
             if not self.is_available():
                 raise Exception("Ollama not available or model missing")
 
-        payload = {
-            "model": self.model_name,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.1,
-                "top_p": 0.9,
-                "num_predict": 700,
-            },
-        }
         try:
             self.logger.info(f"[LLM] POST {self._generate_url} (model={self.model_name})")
-            resp = requests.post(self._generate_url, json=payload, timeout=300)
-            resp.raise_for_status()
-            result = resp.json()
-            text = (result or {}).get("response", "")
-            self.logger.info(f"[LLM] rx chars={len(text)}")
-
-            if not expect_json:
-                return text.strip()
-
-            # Try codefence JSON first, then greedy
-            js = self._extract_json(text)
-            if js is not None:
-                return js
-            # If the model already returned naked JSON:
-            t = text.strip()
-            if t.startswith("{") and t.endswith("}"):
-                return t
-            raise Exception("No JSON object found in LLM response")
-        except requests.exceptions.Timeout:
+            if expect_json:
+                text = self._generate_json_streamed(prompt)
+            else:
+                resp = _post_json(
+                    self._generate_url, self._payload(prompt, expect_json), _JSON_HEADERS, timeout=300, retries=_OLLAMA_RETRY
+                )
+                text = self._parse_response(resp.status, resp.data, expect_json)
+            self._cooldown_until = 0.0
+            return text
+        except urllib3.exceptions.TimeoutError:
+            self._invalidate_availability()
+            raise Exception("Ollama request timed out (model may still be loading)")
+        except urllib3.exceptions.HTTPError as e:
+            url = self._generate_url
+            self._invalidate_availability()
+            raise Exception(f"Cannot connect to Ollama at {url}: {e}")
+        except Exception as e:
+            self.logger.exception(f"[LLM] call failed: {e}")
+            raise
+
+    async def extract_parameters_async(self, prompt: str, expect_json: bool = True) -> str:
+        self._check_cooldown()
+        if not self._generate_url:
+            if not await asyncio.to_thread(self.is_available):
+                raise Exception("Ollama not available or model missing")
+
+        try:
+            self.logger.info(f"[LLM] POST {self._generate_url} (model={self.model_name})")
+            if expect_json:
+                text = await self._generate_json_streamed_async(prompt)
+            else:
+                resp = await _async_client().post(
+                    self._generate_url, content=json_dumps(self._payload(prompt, expect_json)), headers=_JSON_HEADERS, timeout=300
+                )
+                text = self._parse_response(resp.status_code, resp.content, expect_json)
+            self._cooldown_until = 0.0
+            return text
+        except httpx.TimeoutException:
+            self._invalidate_availability()
             raise Exception("Ollama request timed out (model may still be loading)")
-        except requests.exceptions.ConnectionError as e:
-            raise Exception(f"Cannot connect to Ollama at {self._generate_url}: {e}")
+        except httpx.TransportError as e:
+            url = self._generate_url
+            self._invalidate_availability()
+            raise Exception(f"Cannot connect to Ollama at {url}: {e}")
         except Exception as e:
             self.logger.exception(f"[LLM] call failed: {e}")
             raise
 
     # ---------- helpers ----------
 
-    def _extract_json(self, text: str) -> Optional[str]:
-        m = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, flags=re.DOTALL)
-        if m:
-            return m.group(1).strip()
-        m = re.search(r"(\{.*\})", text, flags=re.DOTALL)
-        if m:
-            return m.group(1).strip()
-        return None
+    def _generate_json_streamed(self, prompt: str) -> str:
+        resp = _POOL.request(
+            "POST",
+            self._generate_url,
+            body=json_dumps(self._payload(prompt, True, stream=True)),
+            headers=_JSON_HEADERS,
+            timeout=300,
+            retries=_OLLAMA_RETRY,
+            preload_content=False,
+        )
+        done = False
+        try:
+            if resp.status >= 400:
+                raise Exception(f"Ollama HTTP {resp.status}: {resp.read()[:300]!r}")
+            parts: List[str] = []
+            tracker = _JSONObjectTracker()
+            for event in _iter_ndjson(resp.stream(OLLAMA_STREAM_CHUNK_BYTES)):
+                if self._stream_step(event, parts, tracker):
+                    done = bool(event.get("done"))
+                    break
+        finally:
+            if done:
+                resp.drain_conn()
+                resp.release_conn()
+            else:
+                # Dropping the connection makes Ollama stop generating
+                resp.close()
+        return self._finish_stream(parts, done)
+
+    async def _generate_json_streamed_async(self, prompt: str) -> str:
+        done = False
+        parts: List[str] = []
+        tracker = _JSONObjectTracker()
+        async with _async_client().stream(
+            "POST",
+            self._generate_url,
+            content=json_dumps(self._payload(prompt, True, stream=True)),
+            headers=_JSON_HEADERS,
+            timeout=300,
+        ) as resp:
+            if resp.status_code >= 400:
+                raise Exception(f"Ollama HTTP {resp.status_code}: {(await resp.aread())[:300]!r}")
+            async for line in resp.aiter_lines():
+                if not line.strip():
+                    continue
+                event = json_loads(line)
+                if self._stream_step(event, parts, tracker):
+                    done = bool(event.get("done"))
+                    break
+        return self._finish_stream(parts, done)
 
+    def _stream_step(self, event: Dict[str, Any], parts: List[str], tracker: _JSONObjectTracker) -> bool:
+        """Append one streamed event; True when the object is complete or generation ended."""
+        if event.get("error"):
+            raise Exception(f"Ollama error: {event['error']}")
+        piece = event.get("response", "")
+        parts.append(piece)
+        return tracker.feed(piece) or bool(event.get("done"))
 
-class OpenAIProvider(LLMProvider):
+    def _finish_stream(self, parts: List[str], done: bool) -> str:
+        text = "".join(parts)
+        self.logger.info(f"[LLM] rx chars={len(text)}{'' if done else ' (stopped at end of JSON)'}")
+        return _finalize_text(text, True)
+
+    def _payload(self, prompt: str, expect_json: bool = True, stream: bool = False) -> dict:
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": 0.1,
+                "top_p": 0.9,
+                "num_predict": OLLAMA_JSON_NUM_PREDICT if expect_json else OLLAMA_TEXT_NUM_PREDICT,
+            },
+        }
+        if expect_json:
+            # Constrained decoding: the response is a bare JSON object
+            payload["format"] = "json"
+            payload["options"]["stop"] = OLLAMA_JSON_STOP
+        return payload
+
+    def _parse_response(self, status: int, data: bytes, expect_json: bool) -> str:
+        if status >= 400:
+            raise Exception(f"Ollama HTTP {status}: {data[:300]!r}")
+        result = json_loads(data)
+        text = (result or {}).get("response", "")
+        self.logger.info(f"[LLM] rx chars={len(text)}")
+        return _finalize_text(text, expect_json)
+
+
+class OpenAIProvider:
     """
     OpenAI provider via REST API.
     
@@ -151,9 +509,14 @@ class OpenAIProvider(LLMProvider):
     """
 
     def __init__(self, model_name: str = "gpt-4o-mini", api_key: Optional[str] = None):
-        super().__init__(model_name)
+        self.model_name = model_name
+        self.logger = logging.getLogger(__name__)
         self.api_key = api_key or os.getenv("OPENAI_API_KEY", "").strip()
         self.base_url = "https://api.openai.com/v1/chat/completions"
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
         
     def is_available(self) -> bool:
         """Check if OpenAI API key is configured."""
@@ -170,11 +533,37 @@ class OpenAIProvider(LLMProvider):
         if not self.is_available():
             raise Exception("OpenAI API key not configured")
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
+        try:
+            self.logger.info(f"[LLM] POST {self.base_url} (model={self.model_name})")
+            resp = _post_json(self.base_url, self._payload(prompt, expect_json), self._headers, timeout=60)
+            return self._parse_response(resp.status, resp.headers, resp.data, expect_json)
+        except urllib3.exceptions.TimeoutError:
+            raise Exception("OpenAI request timed out")
+        except urllib3.exceptions.HTTPError as e:
+            raise Exception(f"Cannot connect to OpenAI API: {e}")
+        except Exception as e:
+            self.logger.exception(f"[LLM] call failed: {e}")
+            raise
+
+    async def extract_parameters_async(self, prompt: str, expect_json: bool = True) -> str:
+        if not self.is_available():
+            raise Exception("OpenAI API key not configured")
+
+        try:
+            self.logger.info(f"[LLM] POST {self.base_url} (model={self.model_name})")
+            resp = await _async_client().post(
+                self.base_url, content=json_dumps(self._payload(prompt, expect_json)), headers=self._headers, timeout=60
+            )
+            return self._parse_response(resp.status_code, resp.headers, resp.content, expect_json)
+        except httpx.TimeoutException:
+            raise Exception("OpenAI request timed out")
+        except httpx.TransportError as e:
+            raise Exception(f"Cannot connect to OpenAI API: {e}")
+        except Exception as e:
+            self.logger.exception(f"[LLM] call failed: {e}")
+            raise
+
+    def _payload(self, prompt: str, expect_json: bool = True) -> dict:
         messages = [
             {
                 "role": "system",
@@ -192,56 +581,24 @@ class OpenAIProvider(LLMProvider):
             "temperature": 0.1,
             "max_tokens": 700,
         }
-        
-        try:
-            self.logger.info(f"[LLM] POST {self.base_url} (model={self.model_name})")
-            resp = requests.post(self.base_url, json=payload, headers=headers, timeout=60)
-            resp.raise_for_status()
-            result = resp.json()
-            
-            # Extract the assistant's message content
-            text = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-            self.logger.info(f"[LLM] rx chars={len(text)}")
-            
-            if not expect_json:
-                return text.strip()
-            
-            # Try to extract JSON from the response
-            js = self._extract_json(text)
-            if js is not None:
-                return js
-            
-            # If the model already returned naked JSON:
-            t = text.strip()
-            if t.startswith("{") and t.endswith("}"):
-                return t
-            
-            raise Exception("No JSON object found in LLM response")
-            
-        except requests.exceptions.Timeout:
-            raise Exception("OpenAI request timed out")
-        except requests.exceptions.HTTPError as e:
-            if resp.status_code == 401:
-                raise Exception("OpenAI API authentication failed - check your API key")
-            elif resp.status_code == 429:
-                raise Exception("OpenAI API rate limit exceeded")
-            else:
-                raise Exception(f"OpenAI API error: {resp.status_code} - {resp.text}")
-        except requests.exceptions.ConnectionError as e:
-            raise Exception(f"Cannot connect to OpenAI API: {e}")
-        except Exception as e:
-            self.logger.exception(f"[LLM] call failed: {e}")
-            raise
-    
-    def _extract_json(self, text: str) -> Optional[str]:
-        """Extract JSON from response text."""
-        m = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, flags=re.DOTALL)
-        if m:
-            return m.group(1).strip()
-        m = re.search(r"(\{.*\})", text, flags=re.DOTALL)
-        if m:
-            return m.group(1).strip()
-        return None
+        if expect_json:
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    def _parse_response(self, status: int, headers: Any, data: bytes, expect_json: bool) -> str:
+        _remember_rate_limits(self.model_name, headers)
+        if status == 401:
+            raise Exception("OpenAI API authentication failed - check your API key")
+        elif status == 429:
+            raise RateLimitError("OpenAI API rate limit exceeded", _parse_retry_after(headers.get("Retry-After")))
+        elif status >= 400:
+            raise Exception(f"OpenAI API error: {status} - {data.decode('utf-8', 'replace')}")
+        result = json_loads(data)
+
+        # Extract the assistant's message content
+        text = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        self.logger.info(f"[LLM] rx chars={len(text)}")
+        return _finalize_text(text, expect_json)
 
 
 class LLMProviderManager:
@@ -249,43 +606,199 @@ class LLMProviderManager:
 
     def __init__(self, api_key: str = ""):
         self.logger = logging.getLogger(__name__)
-        choice = os.getenv("LLM_PROVIDER", "ollama").lower()
+        choice = LLM_PROVIDER
         providers: List[LLMProvider] = []
         
         if choice == "openai":
             # Use OpenAI exclusively
-            openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
             openai_key = api_key or os.getenv("OPENAI_API_KEY", "")
-            providers.append(OpenAIProvider(openai_model, openai_key))
+            providers.append(OpenAIProvider(OPENAI_MODEL, openai_key))
         elif choice == "ollama":
             # Use Ollama exclusively
-            ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1:8b-instruct-q4_K_M")
-            providers.append(LlamaProvider(ollama_model))
+            providers.append(LlamaProvider(OLLAMA_MODEL))
         elif choice == "auto":
             # Try OpenAI first, fallback to Ollama
-            openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
             openai_key = api_key or os.getenv("OPENAI_API_KEY", "")
-            ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1:8b-instruct-q4_K_M")
-            providers.append(OpenAIProvider(openai_model, openai_key))
-            providers.append(LlamaProvider(ollama_model))
+            providers.append(OpenAIProvider(OPENAI_MODEL, openai_key))
+            providers.append(LlamaProvider(OLLAMA_MODEL))
         else:
             # Default to ollama
-            ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1:8b-instruct-q4_K_M")
-            providers.append(LlamaProvider(ollama_model))
+            providers.append(LlamaProvider(OLLAMA_MODEL))
             
         self.providers = providers
 
+    def _cache_key(self, prompt: str, expect_json: bool) -> str:
+        models = "|".join(p.model_name for p in self.providers)
+        return _response_cache_key(models, prompt, expect_json)
+
     def extract_parameters(self, prompt: str, expect_json: bool = True) -> str:
-        last_err: Optional[str] = None
+        key = self._cache_key(prompt, expect_json)
+        cached = _response_cache_get(key)
+        if cached is not None:
+            return cached
+
+        errors: List[Exception] = []
         for p in self.providers:
             try:
                 if p.is_available():
                     self.logger.info(f"[LLM] using {p.__class__.__name__} ({p.model_name})")
-                    return p.extract_parameters(prompt, expect_json=expect_json)
+                    text = p.extract_parameters(prompt, expect_json=expect_json)
+                    _response_cache_put(key, text)
+                    return text
                 else:
                     self.logger.warning(f"[LLM] provider {p.__class__.__name__} not available")
             except Exception as e:
-                last_err = str(e)
-                self.logger.error(f"[LLM] provider {p.__class__.__name__} failed: {last_err}")
+                errors.append(e)
+                self.logger.error(f"[LLM] provider {p.__class__.__name__} failed: {e}")
                 continue
-        raise Exception(f"All LLM providers failed{(': ' + last_err) if last_err else ''}")
\ No newline at end of file
+        raise self._all_failed(errors)
+
+    async def extract_parameters_async(self, prompt: str, expect_json: bool = True, race: bool = True) -> str:
+        """
+        Async extract_parameters. With race=True every provider is started at once and
+        the first successful answer wins (the others are cancelled), so a slow or dead
+        provider costs nothing extra. race=False keeps the sequential fallback order.
+        """
+        key = self._cache_key(prompt, expect_json)
+        cached = _response_cache_get(key)
+        if cached is not None:
+            return cached
+
+        if race:
+            text = await self._race_async(prompt, expect_json)
+        else:
+            text = await self._extract_in_order_async(prompt, expect_json)
+        _response_cache_put(key, text)
+        return text
+
+    async def _race_async(self, prompt: str, expect_json: bool) -> str:
+        # Submit everything first, then collect as results arrive
+        tasks = [asyncio.create_task(self._provider_call_async(p, prompt, expect_json)) for p in self.providers]
+        errors: List[Exception] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception as e:
+                    errors.append(e)
+        finally:
+            for task in tasks:
+                task.cancel()
+        raise self._all_failed(errors)
+
+    async def _extract_in_order_async(self, prompt: str, expect_json: bool) -> str:
+        errors: List[Exception] = []
+        for p in self.providers:
+            try:
+                return await self._provider_call_async(p, prompt, expect_json)
+            except Exception as e:
+                errors.append(e)
+        raise self._all_failed(errors)
+
+    async def _provider_call_async(self, p: LLMProvider, prompt: str, expect_json: bool) -> str:
+        name = p.__class__.__name__
+        if not await asyncio.to_thread(p.is_available):
+            self.logger.warning(f"[LLM] provider {name} not available")
+            raise Exception(f"{name} not available")
+        self.logger.info(f"[LLM] using {name} ({p.model_name})")
+        try:
+            return await p.extract_parameters_async(prompt, expect_json=expect_json)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"[LLM] provider {name} failed: {e}")
+            raise
+
+    def _all_failed(self, errors: List[Exception]) -> Exception:
+        last_err = str(errors[-1]) if errors else None
+        message = f"All LLM providers failed{(': ' + last_err) if last_err else ''}"
+        rate_limited = next((e for e in errors if isinstance(e, RateLimitError)), None)
+        if rate_limited is not None:
+            return RateLimitError(message, rate_limited.retry_after)
+        return Exception(message)
+
+    async def aclose(self) -> None:
+        """Close the pooled async HTTP client of the running event loop."""
+        client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def extract_many(
+        self,
+        prompts: List[str],
+        expect_json: bool = True,
+        max_rpm: int = 3500,
+        max_tpm: int = 200_000,
+        max_concurrency: int = 64,
+        max_attempts: int = 5,
+    ) -> List[Union[str, Exception]]:
+        """
+        Run many prompts concurrently without exceeding the request/token rate limits
+        (the OpenAI cookbook's parallel-processor pattern): a queue drained by up to
+        `max_concurrency` workers, each taking from per-minute RPM and TPM token buckets
+        before dispatch. A 429 pauses every worker for Retry-After (or a jittered
+        exponential backoff) and requeues the prompt.
+
+        Limits learned from OpenAI response headers override max_rpm/max_tpm when lower.
+        Returns one entry per prompt, in order: the response string, or the exception
+        for prompts that failed for good.
+        """
+        model = next((p.model_name for p in self.providers if isinstance(p, OpenAIProvider)), None)
+        learned_rpm, learned_tpm = _RATE_LIMITS.get(model, (max_rpm, max_tpm))
+        requests_bucket = _TokenBucket(min(max_rpm, learned_rpm))
+        tokens_bucket = _TokenBucket(min(max_tpm, learned_tpm))
+
+        results: List[Union[str, Exception, None]] = [None] * len(prompts)
+        queue: "asyncio.Queue[Tuple[int, int]]" = asyncio.Queue()
+        for i in range(len(prompts)):
+            queue.put_nowait((i, 0))
+        cooldown_until = 0.0
+
+        async def worker() -> None:
+            nonlocal cooldown_until
+            while True:
+                try:
+                    i, attempt = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                cached = _response_cache_get(self._cache_key(prompts[i], expect_json))
+                if cached is not None:
+                    # Repeats spend no request/token budget
+                    results[i] = cached
+                    continue
+                pause = cooldown_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                # OpenAI counts prompt tokens (~4 chars each) plus max_tokens against TPM
+                await requests_bucket.acquire(1)
+                await tokens_bucket.acquire(len(prompts[i]) // 4 + 700)
+                try:
+                    results[i] = await self.extract_parameters_async(prompts[i], expect_json, race=False)
+                except RateLimitError as e:
+                    if attempt + 1 >= max_attempts:
+                        results[i] = e
+                        continue
+                    delay = e.retry_after or min(60.0, random.uniform(0.5, 1.0) * 2 ** attempt)
+                    cooldown_until = max(cooldown_until, time.monotonic() + delay)
+                    self.logger.warning(f"[LLM] rate limited; pausing {delay:.1f}s (attempt {attempt + 1})")
+                    queue.put_nowait((i, attempt + 1))
+                except Exception as e:
+                    results[i] = e
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(max_concurrency, len(prompts))))))
+        return results
+
+# One manager per process, so provider availability, pooled clients and the response
+# cache are shared by every request in the worker.
+_MANAGER: Optional[LLMProviderManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_manager() -> LLMProviderManager:
+    """The process-wide LLMProviderManager, created on first use."""
+    global _MANAGER
+    if _MANAGER is None:
+        with _MANAGER_LOCK:
+            if _MANAGER is None:
+                _MANAGER = LLMProviderManager()
+    return _MANAGER
@@ -1,18 +1,61 @@
 # Prompts used by the LLM extractor.
+#
+# OpenAI prompt caching keys on the request prefix, so every prompt keeps its static
+# instructions first and byte-identical across calls. Per-call data (user request,
+# candidate tags, counts, dates, ids) goes at the END only.
+
+from functools import lru_cache
 
 PREFERENCE_EXTRACTION_PROMPT = """
 Extract a short, comma-separated list of preferences from a route request.
 
+Return ONLY a comma-separated list of concise preference concepts (do not include any other text such as "here are the preferences").
+Examples of concepts: "parks, viewpoints, scenic, waterfront, coffee".
+
+DO NOT INCLUDE ANY "AVOID" PREFERENCES FROM THE FOLLOWING LIST:
+avoid_tolls, avoid_stairs, avoid_hills, avoid_highways
+
 User request:
 {user_prompt}
+"""
 
-Return ONLY a comma-separated list of concise preference concepts (do not include any other text such as "here are the preferences").
+_EXTRACTION_RULES = """Schema: {"origin":str,"destination":str,"time_flexibility_minutes":int,"waypoint_queries":[str],"constraints":{"avoid_tolls":bool,"avoid_stairs":bool,"avoid_hills":bool,"avoid_highways":bool,"transport_mode":"walking"|"driving"}}
+
+Tag rules: prefer common tags (natural=water over waterway=seaway); waterfront: natural=water/beach/coastline, leisure=marina; scenic: tourism=viewpoint, leisure=park, natural=peak; green: leisure=park/garden, landuse=forest; skip tags unlikely in urban areas.
+Other rules: origin/destination as specific as possible, including city or town; time_flexibility_minutes defaults to 10.
+"""
+
+# Static prefix of the step-3 prompt (no per-call data here).
+EXTRACTION_PROMPT_PREFIX = f"""Return ONLY minified JSON (no markdown, no prose) with route parameters for the user request at the end.
+
+{_EXTRACTION_RULES}"""
+
+# Batched variants: K user requests per OpenAI call, answered as {"results":[...]} in task order.
+PREFERENCE_BATCH_PROMPT_PREFIX = """
+For each numbered route request below, extract a short, comma-separated list of preference concepts.
+
+Return ONLY minified JSON: {"results":["<concepts for task 1>","<concepts for task 2>",...]} with exactly one string per task, in task order.
 Examples of concepts: "parks, viewpoints, scenic, waterfront, coffee".
 
 DO NOT INCLUDE ANY "AVOID" PREFERENCES FROM THE FOLLOWING LIST:
 avoid_tolls, avoid_stairs, avoid_hills, avoid_highways
 """
 
+EXTRACTION_BATCH_PROMPT_PREFIX = f"""Return ONLY minified JSON (no markdown, no prose): {{"results":[...]}} with exactly one route-parameter object per numbered task at the end, in task order.
+
+Each object follows:
+{_EXTRACTION_RULES}"""
+
+@lru_cache(maxsize=256)
+def _candidates_section(candidate_tags: tuple[str, ...], num_tags: int) -> str:
+    """
+    Everything between the static prefix and the user request. Candidate sets repeat
+    across prompts (FAISS concept cache), so builders only concatenate per call.
+    """
+    candidates_block = "\n".join(f"- {c}" for c in candidate_tags)
+    return f"waypoint_queries: up to {num_tags} tags copied exactly from:\n{candidates_block}\n\nUser request:\n"
+
+
 def create_extraction_prompt_with_candidates(user_prompt: str, candidate_tags: list[str], num_tags: int) -> str:
     """
     Ask the LLM to produce a strict JSON object we can parse.
@@ -29,40 +72,21 @@ def create_extraction_prompt_with_candidates(user_prompt: str, candidate_tags: l
     - Return ONLY JSON, no backticks, no prose.
     """
 
-    candidates_block = "\n".join(f"- {c}" for c in candidate_tags)
-    return f"""
-You are a strict JSON generator. Parse the following user request and return a JSON with extracted route parameters.
+    return EXTRACTION_PROMPT_PREFIX + "\n" + _candidates_section(tuple(candidate_tags), num_tags) + user_prompt + "\n"
+
+
+def create_preference_batch_prompt(user_prompts: list[str]) -> str:
+    """Step-1 prompt for several user requests at once."""
+    tasks = "\n".join(f"### Task {i}\n{p}\n" for i, p in enumerate(user_prompts, 1))
+    return f"{PREFERENCE_BATCH_PROMPT_PREFIX}\n{tasks}"
 
-User request:
-{user_prompt}
 
-Return ONLY valid minified JSON (no markdown, no commentary) with this schema:
-{{
-  "origin": "string",
-  "destination": "string",
-  "time_flexibility_minutes": 10,
-  "waypoint_queries": ["key=value", "..."],
-  "constraints": {{
-    "avoid_tolls": false,
-    "avoid_stairs": false,
-    "avoid_hills": false,
-    "avoid_highways": false,
-    "transport_mode": "walking"
-  }}
-}}
-
-waypoint_queries MUST be selected exactly from the following candidate list of tags (pick up to {num_tags}):
-{candidates_block}
-
-IMPORTANT WAYPOINT QUERY TAG SELECTION GUIDELINES:
-- Prefer common tags over rare ones (e.g., "natural=water" over "waterway=seaway")
-- For coastal/waterfront: prefer "natural=water", "natural=beach", "natural=coastline", "leisure=marina"
-- For scenic/views: prefer "tourism=viewpoint", "leisure=park", "natural=peak"
-- For parks/green: prefer "leisure=park", "leisure=garden", "landuse=forest"
-- Avoid very specific tags that may not exist in urban areas
-
-IMPORTANT EXTRACTION GUIDELINES:
-- When extracting the Origin and Destination, always be as specific as possible and include the city or town.
-- If time flexibility is not specified, set it to 10 minutes.
-- Transport_mode must be either "walking" or "driving".
-"""
\ No newline at end of file
+def create_batch_extraction_prompt_with_candidates(
+    user_prompts: list[str], candidate_tags: list[list[str]], num_tags: int
+) -> str:
+    """Step-3 prompt for several user requests; each task carries its own candidate list."""
+    tasks = [
+        f"### Task {i}\n" + _candidates_section(tuple(tags), num_tags) + prompt + "\n"
+        for i, (prompt, tags) in enumerate(zip(user_prompts, candidate_tags), 1)
+    ]
+    return f"{EXTRACTION_BATCH_PROMPT_PREFIX}\n" + "\n".join(tasks)
@@ -1,37 +1,147 @@
 # backend/geocoding/geocoder.py
 from __future__ import annotations
 from typing import List, Tuple, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 import os
-import json
 import math
+import logging
+import numpy as np
 import requests
+import shapely
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from shapely import wkb
 from shapely.geometry import shape, Polygon, MultiPolygon, Point
 from shapely.ops import unary_union
 
+from backend.json_utils import json_loads
+
+# Optional persistent isochrone cache (pip install diskcache)
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 # ---------------- Mapbox endpoints ----------------
 MAPBOX_GEOCODE_URL = "https://api.mapbox.com/geocoding/v5/mapbox.places"
 MAPBOX_DIRECTIONS_URL = "https://api.mapbox.com/directions/v5/mapbox"
 MAPBOX_ISOCHRONE_URL = "https://api.mapbox.com/isochrone/v1/mapbox"
 
+# Mapbox profiles: driving | walking | cycling
+_MB_PROFILE = {"walking": "walking", "driving": "driving", "cycling": "cycling"}.get
+
 USER_AGENT = "berkeley-detourist/1.0 (berkeley.edu)"
 
 # Hard cap per Mapbox isochrone request. Can override with env:
 #   MB_ISO_MAX_MIN=60 (recommended)
 ISO_MAX_MINUTES = int(os.getenv("MB_ISO_MAX_MIN", "60"))
 
-@dataclass
+# Connection pool for the shared Session. Every Mapbox call here is a GET, so
+# rate-limit and transient gateway statuses are retried with backoff (honoring Retry-After).
+HTTP_POOL_SIZE = 16
+HTTP_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504), raise_on_status=False)
+
+# Opt-in (ISO_DISK_CACHE=1, needs diskcache): isochrones persisted across processes as
+# WKB under ISO_CACHE_DIR. Memory and disk entries are keyed by center (6 decimals, as
+# before), minutes and profile.
+ISO_DISK_CACHE_ENABLED = os.getenv("ISO_DISK_CACHE", "0") == "1"
+ISO_CACHE_DIR = os.getenv("ISO_CACHE_DIR", os.path.expanduser("~/.cache/detourist/isochrones"))
+ISO_CACHE_TTL_S = int(os.getenv("ISO_CACHE_TTL_S", str(30 * 24 * 3600)))
+ISO_KEY_DECIMALS = 6
+
+# Isochrones are simplified (degrees; 1e-4 is ~10 m) before caching so the search-zone
+# intersections run on far fewer vertices. ISO_SIMPLIFY_TOL=0 keeps full resolution.
+ISO_SIMPLIFY_TOL = float(os.getenv("ISO_SIMPLIFY_TOL", "1e-4"))
+
+EARTH_RADIUS_M = 6371000.0
+
+# Concurrent isochrone requests while building a search zone
+ISO_MAX_WORKERS = 8
+
+# Mapbox returns up to 4 contours from one isochrone request
+ISO_CONTOURS_PER_REQUEST = 4
+
+# Overlaps are unioned in chunks of this size, then the partial results, so each
+# GEOS union pass sees a small input
+UNION_CHUNK_SIZE = 8
+
+# Opt-in early exit: stop adding combo overlaps once ZONE_CONVERGENCE_PATIENCE successive
+# ones grow the zone by less than this fraction of its area. Every contour is fetched
+# either way, so this only saves geometry work, and the skipped (extreme) splits can
+# still hold area the zone then misses. 0 (default) unions every combo via _union_areas.
+ZONE_CONVERGENCE_TOL = float(os.getenv("ZONE_CONVERGENCE_TOL", "0"))
+ZONE_CONVERGENCE_PATIENCE = 3
+
+def _bbox_overlap(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    """True if two (minx, miny, maxx, maxy) bounds overlap or touch."""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def _valid_area(geom: Any) -> Polygon | MultiPolygon:
+    """geom unchanged if valid; otherwise its make_valid repair, keeping only the polygonal parts."""
+    if geom.is_valid:
+        return geom
+    fixed = shapely.make_valid(geom)
+    if fixed.geom_type in ("Polygon", "MultiPolygon"):
+        return fixed
+    parts = [p for p in shapely.get_parts(fixed) if p.geom_type in ("Polygon", "MultiPolygon")]
+    return unary_union(parts) if parts else Polygon()
+
+def _local_projection(lat0: float, lon0: float):
+    """
+    (forward, inverse) coordinate transforms between lon/lat degrees and a local equirectangular
+    plane in meters centered on (lat0, lon0); accurate to well under 1% over a city-sized zone.
+    Both take and return (N, 2) arrays, as shapely.transform expects.
+    """
+    ky = math.radians(1.0) * EARTH_RADIUS_M
+    kx = ky * math.cos(math.radians(lat0))
+
+    def forward(xy: np.ndarray) -> np.ndarray:
+        return np.column_stack(((xy[:, 0] - lon0) * kx, (xy[:, 1] - lat0) * ky))
+
+    def inverse(xy: np.ndarray) -> np.ndarray:
+        return np.column_stack((xy[:, 0] / kx + lon0, xy[:, 1] / ky + lat0))
+
+    return forward, inverse
+
+@dataclass(slots=True)
 class Coordinates:
     latitude: float
     longitude: float
 
-@dataclass
+@dataclass(init=False, slots=True)
 class Isochrone:
+    """Exterior ring kept as parallel float64 lat/lon arrays; `polygon` builds Coordinates on demand."""
     center: Coordinates
     travel_time_minutes: int
-    polygon: List[Coordinates]  # exterior ring (lat, lon)
+    lats: np.ndarray = field(repr=False, compare=False)
+    lons: np.ndarray = field(repr=False, compare=False)
 
-@dataclass
+    def __init__(
+        self,
+        center: Coordinates,
+        travel_time_minutes: int,
+        polygon: Optional[List[Coordinates]] = None,
+        lats: Optional[np.ndarray] = None,
+        lons: Optional[np.ndarray] = None,
+    ):
+        self.center = center
+        self.travel_time_minutes = travel_time_minutes
+        if polygon is not None:
+            lats = [c.latitude for c in polygon]
+            lons = [c.longitude for c in polygon]
+        self.lats = np.asarray(lats if lats is not None else [], dtype=np.float64)
+        self.lons = np.asarray(lons if lons is not None else [], dtype=np.float64)
+
+    @property
+    def polygon(self) -> List[Coordinates]:
+        """Exterior ring as (lat, lon) Coordinates, for serialization."""
+        return [Coordinates(latitude=lat, longitude=lon) for lat, lon in zip(self.lats.tolist(), self.lons.tolist())]
+
+@dataclass(slots=True)
 class SearchZone:
     origin_isochrone: Isochrone
     destination_isochrone: Isochrone
@@ -49,8 +159,19 @@ class Geocoder:
         self._ua = user_agent
         # cache: (lat, lon, minutes, profile) -> shapely Polygon/MultiPolygon
         self._iso_cache: Dict[Tuple[float, float, int, str], Polygon | MultiPolygon] = {}
+        # cache: (o_lat, o_lon, d_lat, d_lon, profile) rounded to 5 decimals -> Directions minutes
+        self._ttm_cache: Dict[Tuple[float, float, float, float, str], int] = {}
+        self._iso_disk = None
+        if ISO_DISK_CACHE_ENABLED and DISKCACHE_AVAILABLE:
+            try:
+                self._iso_disk = diskcache.Cache(ISO_CACHE_DIR)
+            except Exception as e:
+                logger.warning("Isochrone disk cache unavailable at %s: %s", ISO_CACHE_DIR, e)
         self._session = requests.Session()
         self._session.headers.update({"User-Agent": self._ua})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=HTTP_RETRY)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
 
     # ---------------- Geocoding (Mapbox) ----------------
     def geocode_address(self, address: str) -> Coordinates:
@@ -65,7 +186,7 @@ class Geocoder:
         }
         r = self._session.get(url, params=params, timeout=20)
         r.raise_for_status()
-        data = r.json()
+        data = json_loads(r.content)
         feats = data.get("features", [])
         if not feats:
             raise ValueError(f"Address not found: {address}")
@@ -75,20 +196,23 @@ class Geocoder:
 
     # ---------------- Routing (Mapbox Directions) ----------------
     def _mb_profile(self, transport_mode: str) -> str:
-        # Mapbox profiles: driving | walking | cycling
-        return {
-            "walking": "walking",
-            "driving": "driving",
-            "cycling": "cycling",
-        }.get(transport_mode, "driving")
+        return _MB_PROFILE((transport_mode or "").strip().lower(), "driving")
 
     def shortest_travel_time_minutes(
         self, origin: Coordinates, destination: Coordinates, transport_mode: str = "driving"
     ) -> int:
         """
-        Shortest travel time (minutes) using Mapbox Directions.
+        Shortest travel time (minutes) using Mapbox Directions. Cached per (rounded) origin/destination/profile.
         """
         profile = self._mb_profile(transport_mode)
+        key = (
+            round(origin.latitude, 5), round(origin.longitude, 5),
+            round(destination.latitude, 5), round(destination.longitude, 5),
+            profile,
+        )
+        if key in self._ttm_cache:
+            return self._ttm_cache[key]
+
         coords = f"{origin.longitude},{origin.latitude};{destination.longitude},{destination.latitude}"
         url = f"{MAPBOX_DIRECTIONS_URL}/{profile}/{coords}"
         params = {
@@ -99,19 +223,20 @@ class Geocoder:
         }
         resp = self._session.get(url, params=params, timeout=30)
         resp.raise_for_status()
-        data = resp.json()
+        data = json_loads(resp.content)
         routes = data.get("routes", [])
         if not routes:
             raise RuntimeError("Directions API returned no route.")
         seconds = float(routes[0].get("duration", 0.0))
-        return max(0, int(round(seconds / 60.0)))
+        minutes = max(0, int(round(seconds / 60.0)))
+        self._ttm_cache[key] = minutes
+        return minutes
 
     # ---------------- Isochrones (Mapbox) ----------------
     @staticmethod
     def _cap_minutes(minutes: int) -> int:
+        # Silent: callers log clamping once per public call rather than per contour
         if minutes > ISO_MAX_MINUTES:
-            # visible log to spot when clamping happens
-            print(f"[Isochrone] requested {minutes} min > cap {ISO_MAX_MINUTES}; clamping.")
             return ISO_MAX_MINUTES
         if minutes < 0:
             return 0
@@ -124,39 +249,100 @@ class Geocoder:
         Exterior ring (largest shell) of a Mapbox Isochrone for a single contour in minutes.
         ALWAYS caps contours_minutes <= ISO_MAX_MINUTES.
         """
+        if travel_time_minutes > ISO_MAX_MINUTES:
+            logger.warning("[Isochrone] requested %s min > cap %s; clamping.", travel_time_minutes, ISO_MAX_MINUTES)
+        geom, capped = self._isochrone_shape(center, travel_time_minutes, transport_mode)
+        arr = self._exterior_array(geom)
+        return Isochrone(center=center, travel_time_minutes=capped, lats=arr[:, 1].copy(), lons=arr[:, 0].copy())
+
+    def _isochrone_shape(
+        self, center: Coordinates, travel_time_minutes: int, transport_mode: str
+    ) -> Tuple[Polygon | MultiPolygon, int]:
+        """Cached (memory, then disk) or freshly fetched isochrone geometry and its capped minutes."""
         profile = self._mb_profile(transport_mode)
         capped = self._cap_minutes(int(travel_time_minutes))
-        key = (round(center.latitude, 6), round(center.longitude, 6), int(capped), profile)
+        geom = self._iso_cached(center, capped, profile)
+        if geom is None:
+            geom = self._fetch_isochrone_contours(center, [capped], transport_mode)[capped]
+        return geom, int(capped)
 
-        if key in self._iso_cache:
-            geom = self._iso_cache[key]
-        else:
-            url = f"{MAPBOX_ISOCHRONE_URL}/{profile}/{center.longitude},{center.latitude}"
-            params = {
-                "access_token": self.api_key,
-                "contours_minutes": int(capped),
-                "polygons": "true",
-            }
-            resp = self._session.get(url, params=params, timeout=30)
-            resp.raise_for_status()
-            gj = resp.json()
-            feats = gj.get("features", [])
-            if not feats:
+    def _iso_key(self, center: Coordinates, minutes: int, profile: str) -> Tuple[float, float, int, str]:
+        return (
+            round(center.latitude, ISO_KEY_DECIMALS), round(center.longitude, ISO_KEY_DECIMALS), int(minutes), profile
+        )
+
+    def _iso_cached(self, center: Coordinates, minutes: int, profile: str) -> Optional[Polygon | MultiPolygon]:
+        """Isochrone geometry from the in-memory cache, then the disk cache; None if neither has it."""
+        key = self._iso_key(center, minutes, profile)
+        geom = self._iso_cache.get(key)
+        if geom is None:
+            geom = self._iso_disk_get(key)
+            if geom is not None:
+                self._iso_cache[key] = geom
+        return geom
+
+    def _fetch_isochrone_contours(
+        self, center: Coordinates, minutes: List[int], transport_mode: str
+    ) -> Dict[int, Polygon | MultiPolygon]:
+        """
+        One Mapbox request for up to ISO_CONTOURS_PER_REQUEST (already capped) contours around center.
+        Each contour is cached under its own key; returns {minutes: geometry}.
+        """
+        profile = self._mb_profile(transport_mode)
+        minutes = sorted(set(int(m) for m in minutes))  # Mapbox wants increasing contours
+        url = f"{MAPBOX_ISOCHRONE_URL}/{profile}/{center.longitude},{center.latitude}"
+        params = {
+            "access_token": self.api_key,
+            "contours_minutes": ",".join(str(m) for m in minutes),
+            "polygons": "true",
+        }
+        resp = self._session.get(url, params=params, timeout=30)
+        resp.raise_for_status()
+        gj = json_loads(resp.content)
+
+        by_contour: Dict[int, list] = {m: [] for m in minutes}
+        for feat in gj.get("features", []):
+            contour = (feat.get("properties") or {}).get("contour")
+            if contour is None and len(minutes) == 1:
+                contour = minutes[0]
+            if contour is not None and int(contour) in by_contour:
+                by_contour[int(contour)].append(shape(feat["geometry"]))
+
+        out: Dict[int, Polygon | MultiPolygon] = {}
+        for m, geoms in by_contour.items():
+            if not geoms:
                 pt = Point(center.longitude, center.latitude)
                 geom = pt.buffer(1e-9)
             else:
-                geoms = [shape(f["geometry"]) for f in feats]
-                geom = unary_union(geoms).buffer(0)
+                geom = _valid_area(unary_union([_valid_area(g) for g in geoms]))
+                if ISO_SIMPLIFY_TOL > 0:
+                    geom = geom.simplify(ISO_SIMPLIFY_TOL, preserve_topology=True)
+            key = self._iso_key(center, m, profile)
             self._iso_cache[key] = geom
+            self._iso_disk_set(key, geom)
+            out[m] = geom
+        return out
 
+    def _uncached_contour_chunks(
+        self, center: Coordinates, minutes: List[int], transport_mode: str
+    ) -> List[List[int]]:
+        """Capped, positive minutes around center not yet cached, in request-sized chunks."""
+        profile = self._mb_profile(transport_mode)
+        missing = sorted({
+            capped for capped in (self._cap_minutes(int(m)) for m in minutes)
+            if capped > 0 and self._iso_cached(center, capped, profile) is None
+        })
+        return [missing[i:i + ISO_CONTOURS_PER_REQUEST] for i in range(0, len(missing), ISO_CONTOURS_PER_REQUEST)]
+
+    @staticmethod
+    def _exterior_array(geom: Polygon | MultiPolygon) -> np.ndarray:
+        """(N, 2) lon/lat array of the exterior ring of geom (its largest shell if multi)."""
         if isinstance(geom, Polygon):
             exterior = geom.exterior
         else:  # MultiPolygon
             largest = max(geom.geoms, key=lambda g: g.area)
             exterior = largest.exterior
-
-        coords = [Coordinates(latitude=lat, longitude=lon) for lon, lat in exterior.coords]
-        return Isochrone(center=center, travel_time_minutes=int(capped), polygon=coords)
+        return shapely.get_coordinates(exterior)
 
     # ---------------- Search zone (grid search over splits) ----------------
     def create_search_zone(
@@ -187,15 +373,76 @@ class Geocoder:
         repr_origin_min = combos[len(combos) // 2]
         repr_dest_min = max_travel_time - repr_origin_min
 
-        for o_min in combos:
-            d_min = max_travel_time - o_min
-            o_geom = self._iso_geom(origin, o_min, transport_mode)
-            d_geom = self._iso_geom(destination, d_min, transport_mode)
-            inter = self._intersect_isochrones(o_geom, d_geom)
-            if inter is not None and not inter.is_empty:
+        # Fetch every distinct (center, minutes) isochrone up front, several contours per
+        # request and requests concurrently; the combo loop below then only does the geometry work.
+        wanted = (
+            {("o", o_min) for o_min in combos}
+            | {("d", max_travel_time - o_min) for o_min in combos}
+            | {("o", repr_origin_min), ("d", repr_dest_min)}
+        )
+        centers = {"o": origin, "d": destination}
+        clamped = sum(1 for _, m in wanted if m > ISO_MAX_MINUTES)
+        if clamped:
+            logger.warning("[Isochrone] %d contour(s) above cap %s min; clamping.", clamped, ISO_MAX_MINUTES)
+        requests_needed = [
+            (centers[side], chunk)
+            for side in centers
+            for chunk in self._uncached_contour_chunks(
+                centers[side], [m for s, m in wanted if s == side], transport_mode
+            )
+        ]
+        if requests_needed:
+            with ThreadPoolExecutor(max_workers=min(ISO_MAX_WORKERS, len(requests_needed))) as pool:
+                list(pool.map(
+                    lambda req: self._fetch_isochrone_contours(req[0], req[1], transport_mode), requests_needed
+                ))
+        geoms = {k: self._iso_geom(centers[k[0]], k[1], transport_mode) for k in wanted}
+
+        # Intersections/unions run in a local metric plane around the O/D midpoint, where
+        # both axes have the same scale; only the final zone is mapped back to lon/lat.
+        to_local, to_lonlat = _local_projection(
+            (origin.latitude + destination.latitude) / 2.0, (origin.longitude + destination.longitude) / 2.0
+        )
+        keys = list(geoms)
+        geoms = dict(zip(keys, shapely.transform(np.array([geoms[k] for k in keys], dtype=object), to_local)))
+
+        # Bounding-box overlap for all combo pairs at once; only survivors reach Shapely
+        o_geoms = np.array([geoms[("o", o_min)] for o_min in combos], dtype=object)
+        d_geoms = np.array([geoms[("d", max_travel_time - o_min)] for o_min in combos], dtype=object)
+        o_b, d_b = shapely.bounds(o_geoms), shapely.bounds(d_geoms)
+        bbox_hit = (
+            (o_b[:, 0] <= d_b[:, 2]) & (d_b[:, 0] <= o_b[:, 2]) & (o_b[:, 1] <= d_b[:, 3]) & (d_b[:, 1] <= o_b[:, 3])
+        )
+
+        # Prepared geometries index their edges, speeding up intersects()/intersection()
+        shapely.prepare(list(geoms.values()))
+        try:
+            # Exact intersects predicate for all bbox survivors in one call
+            idx = np.flatnonzero(bbox_hit)
+            idx = idx[shapely.intersects(o_geoms[idx], d_geoms[idx])]
+            # Center-out, so the representative splits come first and extreme ones can be skipped
+            idx = idx[np.argsort(np.abs(idx - len(combos) // 2), kind="stable")]
+            running: Optional[Polygon | MultiPolygon] = None
+            stagnant = 0
+            for i in idx:
+                inter = self._intersect_isochrones(o_geoms[i], d_geoms[i], checked=True)
+                if inter is None or inter.is_empty:
+                    continue
                 overlaps.append(inter)
+                if ZONE_CONVERGENCE_TOL > 0:
+                    prev_area = running.area if running is not None else 0.0
+                    running = inter if running is None else running.union(inter)
+                    if prev_area > 0 and running.area - prev_area < ZONE_CONVERGENCE_TOL * prev_area:
+                        stagnant += 1
+                        if stagnant >= ZONE_CONVERGENCE_PATIENCE:
+                            break
+                    else:
+                        stagnant = 0
+        finally:
+            shapely.destroy_prepared(list(geoms.values()))
 
-        union_geom = self._union_areas(overlaps)
+        union_geom = _valid_area(running if running is not None else self._union_areas(overlaps))
+        union_geom = shapely.transform(union_geom, to_lonlat)
 
         if union_geom.is_empty:
             intersection_coords: List[Coordinates] = []
@@ -209,6 +456,7 @@ class Geocoder:
                 Coordinates(latitude=lat, longitude=lon) for lon, lat in largest.exterior.coords
             ]
 
+        # Served from the cache filled above
         origin_iso = self.create_isochrone(origin, repr_origin_min, transport_mode)
         dest_iso = self.create_isochrone(destination, repr_dest_min, transport_mode)
 
@@ -219,30 +467,62 @@ class Geocoder:
         )
 
     # ---------------- Helpers ----------------
+    @staticmethod
+    def _iso_disk_key(key: Tuple[float, float, int, str]) -> str:
+        lat, lon, minutes, profile = key
+        return f"iso:{lat:.{ISO_KEY_DECIMALS}f},{lon:.{ISO_KEY_DECIMALS}f}:{minutes}:{profile}"
+
+    def _iso_disk_get(self, key: Tuple[float, float, int, str]) -> Optional[Polygon | MultiPolygon]:
+        if self._iso_disk is None:
+            return None
+        try:
+            raw = self._iso_disk.get(self._iso_disk_key(key))
+            return wkb.loads(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning("Isochrone disk cache read failed: %s", e)
+            return None
+
+    def _iso_disk_set(self, key: Tuple[float, float, int, str], geom: Polygon | MultiPolygon) -> None:
+        if self._iso_disk is None:
+            return
+        try:
+            self._iso_disk.set(self._iso_disk_key(key), wkb.dumps(geom), expire=ISO_CACHE_TTL_S)
+        except Exception as e:
+            logger.warning("Isochrone disk cache write failed: %s", e)
+
     def _iso_geom(self, center: Coordinates, minutes: int, transport_mode: str):
         """Return shapely geometry for an isochrone; tiny buffer for 0 minutes. (Minutes are capped internally.)"""
         if minutes <= 0:
             return Point(center.longitude, center.latitude).buffer(1e-6)
-        iso = self.create_isochrone(center, minutes, transport_mode)
-        ring = [(c.longitude, c.latitude) for c in iso.polygon]
-        return Polygon(ring).buffer(0)
+        geom, _ = self._isochrone_shape(center, minutes, transport_mode)
+        return _valid_area(shapely.polygons(self._exterior_array(geom)))
 
     def _intersect_isochrones(
-        self, geom1: Polygon | MultiPolygon, geom2: Polygon | MultiPolygon
+        self, geom1: Polygon | MultiPolygon, geom2: Polygon | MultiPolygon, checked: bool = False
     ) -> Optional[Polygon | MultiPolygon]:
-        """Pairwise intersection of two isochrone geometries (cleaned)."""
+        """Pairwise intersection of two isochrone geometries (cleaned). checked=True: caller already tested intersects."""
+        # Cheap rejections first: disjoint bounds, then the intersects predicate
+        if not checked and (not _bbox_overlap(geom1.bounds, geom2.bounds) or not geom1.intersects(geom2)):
+            return None
         inter = geom1.intersection(geom2)
         if inter.is_empty:
             return None
         if inter.geom_type in ("Polygon", "MultiPolygon"):
-            return inter.buffer(0)
+            return inter
         return None
 
     def _union_areas(self, geoms: List[Polygon | MultiPolygon]) -> Polygon | MultiPolygon:
-        """Union a list of polygonal areas (safe if empty)."""
+        """Union a list of polygonal areas (safe if empty), tree-shaped in UNION_CHUNK_SIZE chunks. Not re-validated."""
         if not geoms:
             return Polygon()
-        return unary_union(geoms).buffer(0)
+        # Small extents first, so neighbouring chunks hold similarly sized, nearby pieces
+        b = shapely.bounds(np.array(geoms, dtype=object))
+        geoms = [geoms[i] for i in np.argsort((b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1]), kind="stable")]
+        while len(geoms) > 1:
+            geoms = [
+                unary_union(geoms[i:i + UNION_CHUNK_SIZE]) for i in range(0, len(geoms), UNION_CHUNK_SIZE)
+            ]
+        return geoms[0]
 
     def _evenly_spaced_minutes(self, max_travel_time: int, max_count: int = 20) -> List[int]:
         """Return <= max_count evenly spaced minute values from 0..max_travel_time (inclusive)."""
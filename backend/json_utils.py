@@ -0,0 +1,58 @@
+# backend/json_utils.py
+# JSON helpers shared by the backend: (de)serialization through orjson when installed (stdlib
+# json otherwise; both emit the same compact UTF-8 bytes, so hashed cache keys do not depend on
+# which one a worker has), and pulling the first JSON object out of free-form LLM text.
+
+from typing import Any, Optional
+import json
+import re
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_loads(data: bytes | str) -> Any:
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+# String literals (escapes included) or single braces; the alternatives can't overlap,
+# so matching is linear and braces inside strings are skipped as part of their string.
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]', re.DOTALL)
+
+
+def extract_json_span(text: str) -> Optional[str]:
+    """
+    The first balanced {...} object in the text (bare or inside a ```json fence).
+    None if there is no "{" or it is never closed.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    # Fast path: the usual reply is one object, so first "{" .. last "}" parses as-is
+    end = text.rfind("}")
+    if end > start:
+        span = text[start:end + 1]
+        try:
+            json_loads(span)
+            return span
+        except ValueError:
+            pass
+    depth = 0
+    for m in _JSON_TOKEN_RE.finditer(text, start):
+        tok = m.group()
+        if tok == "{":
+            depth += 1
+        elif tok == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:m.end()]
+    return None
@@ -2,20 +2,86 @@
 # Parallel orchestrator: many waypoints (single Overpass pass), many candidates,
 # bounded-parallel build/score, rank top-N. Includes transport-mode forcing and timing.
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
-import logging, time, os, json, hashlib
+import logging, time, os, hashlib, threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
+from functools import lru_cache
 from itertools import combinations
 
+import numpy as np
+
 from redis import Redis
 
+from backend.json_utils import json_dumps, json_loads
 from backend.extraction.llm_extractor import LLMExtractor, ExtractedParameters
 from backend.geocoding.geocoder import Geocoder, Coordinates, Isochrone, SearchZone
 from backend.waypoints.waypoint_searcher import WaypointSearcher, Waypoint
 from backend.routing.route_builder import RouteBuilder, Route, RouteSegment
-from backend.scoring.route_scorer import RouteScorer, RouteScore
+
+if TYPE_CHECKING:
+    # Imported on first use instead (see RouteOrchestrator.route_scorer): it pulls in torch/transformers
+    from backend.scoring.route_scorer import RouteScorer, RouteScore
+
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def _equirect_dist_m(lats: np.ndarray, lons: np.ndarray, points: List[Coordinates]) -> np.ndarray:
+    """(len(points), N) equirectangular distances in meters from each point to each (lat, lon) in degrees."""
+    lats, lons = np.radians(lats), np.radians(lons)
+    ref = np.radians([[p.latitude, p.longitude] for p in points])
+    x = (ref[:, 1:2] - lons) * np.cos((lats + ref[:, 0:1]) / 2.0)
+    y = ref[:, 0:1] - lats
+    return np.hypot(x, y) * EARTH_RADIUS_M
+
+
+@lru_cache(maxsize=256)
+def _candidate_indices(
+    n: int, max_single: int, max_pairs: int, max_triples: int, max_wp_per_route: int, max_candidates: int
+) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Candidate waypoint index sets over n relevance-ordered waypoints (see _make_candidates).
+    Depends only on n and the sizing knobs, so it is memoized across requests.
+    """
+    out: List[Tuple[int, ...]] = [()]  # always include direct
+    any_legacy = (max_single > 0) or (max_pairs > 0) or (max_triples > 0)
+
+    if any_legacy:
+        for i in range(min(n, max(0, max_single))):
+            out.append((i,))
+        cnt = 0
+        for i in range(min(n, max(0, max_single))):
+            for j in range(i + 1, n):
+                if cnt >= max_pairs:
+                    break
+                out.append((i, j))
+                cnt += 1
+            if cnt >= max_pairs:
+                break
+        cnt = 0
+        L = min(n, max(0, max_single))
+        for i in range(L):
+            for j in range(i + 1, L):
+                for k in range(j + 1, L):
+                    if cnt >= max_triples:
+                        break
+                    out.append((i, j, k))
+                    cnt += 1
+                if cnt >= max_triples:
+                    break
+            if cnt >= max_triples:
+                break
+    else:
+        K = min(max(0, max_wp_per_route), n)
+        for k in range(1, K + 1):
+            out.extend(combinations(range(n), k))
+
+    if max_candidates and max_candidates > 0:
+        out = out[:max_candidates]
+
+    return tuple(out)
 
 
 # -------------------- Small Redis JSON cache with prefix --------------------
@@ -25,19 +91,27 @@ class Cache:
         self.prefix = (prefix or "").strip()
 
     def _hash_key(self, namespace: str, payload: Dict[str, Any]) -> str:
-        s = json.dumps(payload, sort_keys=True, separators=(",", ":"))
-        h = hashlib.sha256(s.encode("utf-8")).hexdigest()
+        h = hashlib.sha256(json_dumps(payload, sort_keys=True)).hexdigest()
         ns = f"{self.prefix}:{namespace}" if self.prefix else namespace
         return f"{ns}:{h}"
 
     def get_json(self, namespace: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         key = self._hash_key(namespace, payload)
         val = self.client.get(key)
-        return json.loads(val) if val else None
+        return json_loads(val) if val else None
+
+    def get_json_many(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Any]]:
+        """get_json for several (namespace, payload) pairs in one pipelined round trip."""
+        if not items:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        for namespace, payload in items:
+            pipe.get(self._hash_key(namespace, payload))
+        return [json_loads(val) if val else None for val in pipe.execute()]
 
     def set_json(self, namespace: str, payload: Dict[str, Any], value: Dict[str, Any], ttl_seconds: int = 600) -> None:
         key = self._hash_key(namespace, payload)
-        self.client.setex(key, timedelta(seconds=ttl_seconds), json.dumps(value))
+        self.client.setex(key, timedelta(seconds=ttl_seconds), json_dumps(value))
 
 
 # ---------- API-facing dataclasses ----------
@@ -92,10 +166,13 @@ class RouteOrchestrator:
         self.geocoder = Geocoder(mapbox_key)
         self.waypoint_searcher = WaypointSearcher(config.get("poi_api_key", ""))  # Overpass (key unused)
         self.route_builder = RouteBuilder(mapbox_key)
-        self.route_scorer = RouteScorer(
+        # Scorer is built on first use: importing it loads torch/transformers
+        self._scorer_args = dict(
             clip_model_name=os.getenv("CLIP_MODEL_NAME", config.get("clip_model_name", "openai/clip-vit-base-patch32")),
             mapillary_token=mapillary_token,
         )
+        self._route_scorer: Optional["RouteScorer"] = None
+        self._scorer_lock = threading.Lock()
 
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -113,6 +190,9 @@ class RouteOrchestrator:
         self.pool = ThreadPoolExecutor(max_workers=int(os.getenv("ORCH_MAX_WORKERS", "4")))
         self.rb_max_workers = int(os.getenv("RB_MAX_WORKERS", "3"))
         self.scorer_max_workers = int(os.getenv("SCORER_MAX_WORKERS", "2"))
+        # Long-lived build/score pools shared by all requests (bounded globally by the knobs above)
+        self.rb_pool = ThreadPoolExecutor(max_workers=max(1, self.rb_max_workers), thread_name_prefix="rb")
+        self.score_pool = ThreadPoolExecutor(max_workers=max(1, self.scorer_max_workers), thread_name_prefix="score")
 
         # Candidate/waypoint sizing knobs
         self.wp_top_k = int(os.getenv("WP_TOP_K", "12"))
@@ -121,6 +201,9 @@ class RouteOrchestrator:
         self.route_max_triples= int(os.getenv("ROUTE_MAX_TRIPLES", "0"))
         self.max_wp_per_route = max(0, int(os.getenv("MAX_WP_PER_ROUTE", "3")))
         self.rb_max_candidates= int(os.getenv("RB_MAX_CANDIDATES", "12"))
+        # Without CLIP, ranking rests on efficiency + preference match only; opt in to
+        # building just max_results candidates (direct + top singles) on that path
+        self.unscored_cap_candidates = os.getenv("UNSCORED_CAP_CANDIDATES", "false").lower() == "true"
 
     # -------------------- (De)serialization helpers --------------------
     def _coords_to_dict(self, c: Coordinates) -> Dict[str, float]:
@@ -133,14 +216,17 @@ class RouteOrchestrator:
         return {
             "center": self._coords_to_dict(iso.center),
             "travel_time_minutes": int(iso.travel_time_minutes),
-            "polygon": [self._coords_to_dict(p) for p in iso.polygon],
+            "polygon": [
+                {"latitude": lat, "longitude": lon} for lat, lon in zip(iso.lats.tolist(), iso.lons.tolist())
+            ],
         }
 
     def _iso_from_dict(self, d: Dict[str, Any]) -> Isochrone:
         return Isochrone(
             center=self._coords_from_dict(d["center"]),
             travel_time_minutes=int(d["travel_time_minutes"]),
-            polygon=[self._coords_from_dict(p) for p in d.get("polygon", [])],
+            lats=[float(p["latitude"]) for p in d.get("polygon", [])],
+            lons=[float(p["longitude"]) for p in d.get("polygon", [])],
         )
 
     def _zone_to_dict(self, z: SearchZone) -> Dict[str, Any]:
@@ -225,57 +311,25 @@ class RouteOrchestrator:
         return f"{w.name}:{round(w.coordinates.latitude,6)}:{round(w.coordinates.longitude,6)}"
 
     # ---------- Candidate generation ----------
-    def _make_candidates(self, waypoints: List[Waypoint]) -> List[List[Waypoint]]:
+    def _make_candidates(self, waypoints: List[Waypoint], already_sorted: bool = False) -> List[List[Waypoint]]:
         """
         Generalized candidate builder.
         - Always include [] (direct).
         - If ROUTE_MAX_SINGLE/PAIRS/TRIPLES are set (>0), respect those counts.
         - Otherwise, use MAX_WP_PER_ROUTE to generate combinations up to K.
         - Hard cap with RB_MAX_CANDIDATES if > 0.
+        already_sorted: waypoints are already in descending relevance order (skip the sort).
         """
-        ordered = sorted(waypoints, key=lambda w: w.relevance_score, reverse=True)
+        ordered = waypoints if already_sorted else sorted(waypoints, key=lambda w: w.relevance_score, reverse=True)
         if self.wp_top_k > 0:
             ordered = ordered[: self.wp_top_k]
+        return [[ordered[i] for i in idx] for idx in _candidate_indices(len(ordered), *self._candidate_knobs())]
 
-        out: List[List[Waypoint]] = [[]]  # always include direct
-        any_legacy = (self.route_max_single > 0) or (self.route_max_pairs > 0) or (self.route_max_triples > 0)
-
-        if any_legacy:
-            for w in ordered[: max(0, self.route_max_single)]:
-                out.append([w])
-            cnt = 0
-            for i in range(min(len(ordered), max(0, self.route_max_single))):
-                for j in range(i + 1, len(ordered)):
-                    if cnt >= self.route_max_pairs:
-                        break
-                    out.append([ordered[i], ordered[j]])
-                    cnt += 1
-                if cnt >= self.route_max_pairs:
-                    break
-            cnt = 0
-            L = min(len(ordered), max(0, self.route_max_single))
-            for i in range(L):
-                for j in range(i + 1, L):
-                    for k in range(j + 1, L):
-                        if cnt >= self.route_max_triples:
-                            break
-                        out.append([ordered[i], ordered[j], ordered[k]])
-                        cnt += 1
-                    if cnt >= self.route_max_triples:
-                        break
-                if cnt >= self.route_max_triples:
-                    break
-        else:
-            K = max(0, self.max_wp_per_route)
-            K = min(K, len(ordered))
-            for k in range(1, K + 1):
-                for combo in combinations(ordered, k):
-                    out.append(list(combo))
-
-        if self.rb_max_candidates and self.rb_max_candidates > 0:
-            out = out[: self.rb_max_candidates]
-
-        return out
+    def _candidate_knobs(self) -> Tuple[int, int, int, int, int]:
+        return (
+            self.route_max_single, self.route_max_pairs, self.route_max_triples,
+            self.max_wp_per_route, self.rb_max_candidates,
+        )
 
     # -------------------- Main entrypoint --------------------
     def generate_routes(self, request: RouteRequest) -> RouteResponse:
@@ -286,24 +340,28 @@ class RouteOrchestrator:
             # 1) LLM (cache) + geocode futures
             t = time.time()
             llm_key = {"prompt": request.user_prompt}
-            cached_llm = self.cache.get_json("llm_extract_v1", llm_key)
-
             origin_text_hint = (request.origin or {}).get("text")
             dest_text_hint = (request.destination or {}).get("text")
 
+            def _geocode_key(text: str) -> Dict[str, str]:
+                return {"text": (text or "").strip().lower()}
+
+            # One pipelined round trip for the extraction and both hinted geocodes
+            cached_llm, cached_origin, cached_dest = self.cache.get_json_many([
+                ("llm_extract_v1", llm_key),
+                ("geocode_v1", _geocode_key(origin_text_hint)),
+                ("geocode_v1", _geocode_key(dest_text_hint)),
+            ])
+
             if cached_llm:
                 ep = ExtractedParameters(**cached_llm)
                 f_extract = None
             else:
                 f_extract = self.pool.submit(self.extractor.extract_parameters, request.user_prompt)
 
-            def _cached_geocode(text: str) -> Coordinates:
-                gkey = {"text": (text or "").strip().lower()}
-                cached = self.cache.get_json("geocode_v1", gkey)
-                if cached:
-                    return self._coords_from_dict(cached)
+            def _geocode_and_cache(text: str) -> Coordinates:
                 coords = self.geocoder.geocode_address(text)
-                self.cache.set_json("geocode_v1", gkey, self._coords_to_dict(coords), ttl_seconds=86400)
+                self.cache.set_json("geocode_v1", _geocode_key(text), self._coords_to_dict(coords), ttl_seconds=86400)
                 return coords
 
             origin_coords: Optional[Coordinates] = None
@@ -313,12 +371,18 @@ class RouteOrchestrator:
             if request.origin and request.origin.get("lat") is not None and request.origin.get("lon") is not None:
                 origin_coords = Coordinates(float(request.origin["lat"]), float(request.origin["lon"]))
             elif origin_text_hint:
-                f_origin = self.pool.submit(_cached_geocode, origin_text_hint)
+                if cached_origin:
+                    origin_coords = self._coords_from_dict(cached_origin)
+                else:
+                    f_origin = self.pool.submit(_geocode_and_cache, origin_text_hint)
 
             if request.destination and request.destination.get("lat") is not None and request.destination.get("lon") is not None:
                 dest_coords = Coordinates(float(request.destination["lat"]), float(request.destination["lon"]))
             elif dest_text_hint:
-                f_dest = self.pool.submit(_cached_geocode, dest_text_hint)
+                if cached_dest:
+                    dest_coords = self._coords_from_dict(cached_dest)
+                else:
+                    f_dest = self.pool.submit(_geocode_and_cache, dest_text_hint)
 
             if cached_llm is None:
                 ep = f_extract.result()
@@ -339,24 +403,88 @@ class RouteOrchestrator:
 
             # 2) transport mode + geocode finalize
             transport_mode = (ep.constraints or {}).get("transport_mode", os.getenv("DEFAULT_TRANSPORT_MODE", "driving"))
+            # LLM-extracted places still unresolved: one pipelined cache read for both,
+            # then start the remaining geocodes together and wait
+            pending = [
+                (side, text)
+                for side, text, coords, fut in (
+                    ("o", ep.origin, origin_coords, f_origin),
+                    ("d", ep.destination, dest_coords, f_dest),
+                )
+                if coords is None and fut is None
+            ]
+            hits = self.cache.get_json_many([("geocode_v1", _geocode_key(text)) for _, text in pending])
+            for (side, text), hit in zip(pending, hits):
+                if side == "o":
+                    if hit:
+                        origin_coords = self._coords_from_dict(hit)
+                    else:
+                        f_origin = self.pool.submit(_geocode_and_cache, text)
+                else:
+                    if hit:
+                        dest_coords = self._coords_from_dict(hit)
+                    else:
+                        f_dest = self.pool.submit(_geocode_and_cache, text)
             if origin_coords is None:
-                origin_coords = (f_origin.result() if f_origin else _cached_geocode(origin_text_hint or ep.origin))
+                origin_coords = f_origin.result()
             if dest_coords is None:
-                dest_coords = (f_dest.result() if f_dest else _cached_geocode(dest_text_hint or ep.destination))
+                dest_coords = f_dest.result()
 
-            # 3) Search zone (cache)
-            t = time.time()
+            constraints = dict(ep.constraints or {})
+            constraints.setdefault("transport_mode", transport_mode)
+            _force_mode = os.getenv("FORCE_TRANSPORT_MODE") or os.getenv("DEFAULT_TRANSPORT_MODE")
+            if _force_mode:
+                constraints["transport_mode"] = _force_mode.strip().lower()
+
+            # O/D dicts go into the baseline, zone and routes keys: build them once
+            o_dict = self._coords_to_dict(origin_coords)
+            d_dict = self._coords_to_dict(dest_coords)
+
+            # Baseline duration only needs O/D + mode: compute it alongside steps 3-5 (used in 6)
+            baseline_key = {
+                "o": o_dict,
+                "d": d_dict,
+                "mode": constraints.get("transport_mode", "driving"),
+            }
+
+            # Zone and waypoint keys are also known now: fetch all three in one round trip
             max_additional_minutes = ep.time_flexibility_minutes or 30
             if request.time and isinstance(request.time.get("max_duration_min"), int):
                 max_additional_minutes = request.time["max_duration_min"]
 
             zone_key = {
-                "o": self._coords_to_dict(origin_coords),
-                "d": self._coords_to_dict(dest_coords),
+                "o": o_dict,
+                "d": d_dict,
                 "max_additional": int(max_additional_minutes),
                 "mode": transport_mode,
             }
-            cached_zone = self.cache.get_json("search_zone_v1", zone_key)
+            waypoint_queries = (ep.waypoint_queries or [])
+            wp_key = {"zone": zone_key, "queries": waypoint_queries}
+            cached_baseline, cached_zone, cached_wps = self.cache.get_json_many([
+                ("baseline_duration_v1", baseline_key),
+                ("search_zone_v1", zone_key),
+                ("waypoints_v2", wp_key),
+            ])
+
+            def _cached_baseline() -> int:
+                if cached_baseline:
+                    duration = int(cached_baseline.get("duration", 0))
+                    self.logger.info("[baseline] Using cached baseline: %ds", duration)
+                    return duration
+                duration = self.route_builder.get_baseline_duration(origin_coords, dest_coords, constraints)
+                self.cache.set_json(
+                    "baseline_duration_v1",
+                    baseline_key,
+                    {"duration": duration},
+                    ttl_seconds=86400  # Cache for 24h (baseline routes don't change often)
+                )
+                self.logger.info("[baseline] Computed baseline: %ds", duration)
+                return duration
+
+            f_baseline = self.pool.submit(_cached_baseline)
+
+            # 3) Search zone (cache)
+            t = time.time()
             if cached_zone:
                 search_zone = self._zone_from_dict(cached_zone)
             else:
@@ -371,11 +499,9 @@ class RouteOrchestrator:
 
             # 4) Waypoints (cache)
             t = time.time()
-            waypoint_queries = (ep.waypoint_queries or [])
-            wp_key = {"zone": zone_key, "queries": waypoint_queries}
-            cached_wps = self.cache.get_json("waypoints_v2", wp_key)
             if cached_wps:
                 waypoints = [self._wp_from_dict(w) for w in cached_wps]
+                wp_keys = [self._wp_key(w) for w in waypoints]
                 timings["waypoints_overpass"] = 0.0
             else:
                 try:
@@ -383,52 +509,51 @@ class RouteOrchestrator:
                 except Exception as e:
                     self.logger.warning("Waypoint search failed: %s", e)
                     waypoints = []
-                # de-dupe & keep top-K
+                # de-dupe & keep top-K (keys are kept alongside for the routes key below)
                 seen = set()
                 dedup: List[Waypoint] = []
+                wp_keys = []
                 for w in sorted(waypoints, key=lambda w: w.relevance_score, reverse=True):
                     k = self._wp_key(w)
                     if k not in seen:
                         seen.add(k)
                         dedup.append(w)
+                        wp_keys.append(k)
                     if self.wp_top_k > 0 and len(dedup) >= self.wp_top_k:
                         break
                 waypoints = dedup
                 self.cache.set_json("waypoints_v2", wp_key, [self._wp_to_dict(w) for w in waypoints], ttl_seconds=1800)
             timings["waypoints_overpass"] = time.time() - t
 
-            # Optional: drop waypoints too close to O/D
-            def _dist_m(a: Coordinates, b: Coordinates) -> float:
-                import math
-                R = 6371000.0
-                lat1, lon1 = math.radians(a.latitude), math.radians(a.longitude)
-                lat2, lon2 = math.radians(b.latitude), math.radians(b.longitude)
-                x = (lon2 - lon1) * math.cos((lat1 + lat2) / 2.0)
-                y = (lat2 - lat1)
-                return (x * x + y * y) ** 0.5 * R
-
+            # Optional: drop waypoints too close to O/D (equirectangular distance, all waypoints at once)
             near_thresh_m = float(os.getenv("WAYPOINT_NEAR_THRESHOLD_M", "100"))
-            waypoints = [
-                w for w in waypoints
-                if _dist_m(w.coordinates, origin_coords) > near_thresh_m
-                and _dist_m(w.coordinates, dest_coords) > near_thresh_m
-            ]
+            if waypoints:
+                dist = _equirect_dist_m(
+                    np.array([w.coordinates.latitude for w in waypoints]),
+                    np.array([w.coordinates.longitude for w in waypoints]),
+                    [origin_coords, dest_coords],
+                )
+                far = (dist > near_thresh_m).all(axis=0).tolist()
+                waypoints = [w for w, keep in zip(waypoints, far) if keep]
+                wp_keys = [k for k, keep in zip(wp_keys, far) if keep]
 
             # 5) Build many route candidates (bounded parallel Mapbox)
             t = time.time()
-            constraints = dict(ep.constraints or {})
-            constraints.setdefault("transport_mode", transport_mode)
-            _force_mode = os.getenv("FORCE_TRANSPORT_MODE") or os.getenv("DEFAULT_TRANSPORT_MODE")
-            if _force_mode:
-                constraints["transport_mode"] = _force_mode.strip().lower()
-
-            candidates = self._make_candidates(waypoints)
+            # Step 4 leaves waypoints in descending relevance order (cached lists were stored that way)
+            candidates = self._make_candidates(waypoints, already_sorted=True)
+            use_images = os.getenv("ENABLE_SCORING", "false").lower() == "true"
+            max_results = max(1, int(request.max_results or 3))
+            cand_cap = max_results if (self.unscored_cap_candidates and not use_images) else 0
+            if cand_cap:
+                candidates = candidates[:cand_cap]
 
             r_key = {
-                "o": self._coords_to_dict(origin_coords),
-                "d": self._coords_to_dict(dest_coords),
-                "wps_topk": [self._wp_key(w) for w in waypoints],
-                "cand_hash": hash(tuple(tuple((c[i].name, round(c[i].coordinates.latitude,6), round(c[i].coordinates.longitude,6)) for i in range(len(c))) for c in candidates)),
+                "o": o_dict,
+                "d": d_dict,
+                "wps_topk": wp_keys,
+                # Candidates are fully determined by the waypoints above plus the sizing knobs
+                # (the old builtin hash() of them was salted per process, so keys never matched across workers)
+                "cand_spec": [self.wp_top_k, *self._candidate_knobs(), cand_cap],
                 "constraints": constraints,
             }
             cached_routes = self.cache.get_json("routes_v3", r_key)
@@ -449,20 +574,19 @@ class RouteOrchestrator:
                         except Exception as e:
                             self.logger.warning("Route build failed: %s", e)
                 else:
-                    with ThreadPoolExecutor(max_workers=min(self.rb_max_workers, len(candidates))) as rpool:
-                        futs = {
-                            rpool.submit(
-                                self.route_builder.build_single_route, origin_coords, dest_coords, c, constraints
-                            ): tuple(c)
-                            for c in candidates
-                        }
-                        for fut in as_completed(futs):
-                            try:
-                                r = fut.result()
-                                if r:
-                                    built.append(r)
-                            except Exception as e:
-                                self.logger.warning("Route build failed: %s", e)
+                    futs = {
+                        self.rb_pool.submit(
+                            self.route_builder.build_single_route, origin_coords, dest_coords, c, constraints
+                        ): tuple(c)
+                        for c in candidates
+                    }
+                    for fut in as_completed(futs):
+                        try:
+                            r = fut.result()
+                            if r:
+                                built.append(r)
+                        except Exception as e:
+                            self.logger.warning("Route build failed: %s", e)
 
                 if not built:
                     self.logger.warning("No routes built; trying direct route fallback.")
@@ -476,40 +600,20 @@ class RouteOrchestrator:
 
             # 6) Score & rank — bounded parallel CLIP
             t = time.time()
-            use_images = os.getenv("ENABLE_SCORING", "false").lower() == "true"
             min_imgs = int(os.getenv("SCORING_MIN_IMAGES", "3" if use_images else "0"))
             max_imgs = int(os.getenv("SCORING_MAX_IMAGES", "6" if use_images else "0"))
 
-            # Calculate baseline duration
-            baseline_key = {
-                "o": self._coords_to_dict(origin_coords),
-                "d": self._coords_to_dict(dest_coords),
-                "mode": constraints.get("transport_mode", "driving"),
-            }
-            cached_baseline = self.cache.get_json("baseline_duration_v1", baseline_key)
-            if cached_baseline:
-                baseline_duration = int(cached_baseline.get("duration", 0))
-                self.logger.info("[baseline] Using cached baseline: %ds", baseline_duration)
-            else:
-                try:
-                    baseline_duration = self.route_builder.get_baseline_duration(
-                        origin_coords, dest_coords, constraints
-                    )
-                    self.cache.set_json(
-                        "baseline_duration_v1",
-                        baseline_key,
-                        {"duration": baseline_duration},
-                        ttl_seconds=86400  # Cache for 24h (baseline routes don't change often)
-                    )
-                    self.logger.info("[baseline] Computed baseline: %ds", baseline_duration)
-                except Exception as e:
-                    self.logger.warning("[baseline] Failed to compute baseline: %s. Using fallback.", e)
-                    # Fallback: estimate from routes if available
-                    baseline_duration = min(r.total_duration_seconds for r in routes) if routes else 600
+            # Baseline duration (started after step 2)
+            try:
+                baseline_duration = f_baseline.result()
+            except Exception as e:
+                self.logger.warning("[baseline] Failed to compute baseline: %s. Using fallback.", e)
+                # Fallback: estimate from routes if available
+                baseline_duration = min(r.total_duration_seconds for r in routes) if routes else 600
             timings["baseline_duration"] = time.time() - t
             t = time.time()
 
-            def _score_one(r: Route) -> RouteScore:
+            def _score_one(r: Route) -> "RouteScore":
                 return self.route_scorer.score_routes(
                     [r],
                     request.user_prompt,
@@ -518,32 +622,35 @@ class RouteOrchestrator:
                     baseline_duration=baseline_duration,
                 )[0]
 
-            scored: List[RouteScore] = []
+            scored: List["RouteScore"] = []
             if not routes:
                 timings["score_parallel"] = 0.0
-            elif self.scorer_max_workers <= 1 or len(routes) == 1:
-                for r in routes:
-                    try:
-                        scored.append(_score_one(r))
-                    except Exception as e:
-                        self.logger.warning("Scoring failed: %s", e)
-                timings["score_parallel"] = time.time() - t
             else:
-                with ThreadPoolExecutor(max_workers=min(self.scorer_max_workers, len(routes))) as spool:
-                    futs = {spool.submit(_score_one, r): r for r in routes}
-                    for fut in as_completed(futs):
+                # One call: images fetched concurrently on score_pool, one CLIP batch for all routes
+                try:
+                    scored = self.route_scorer.score_routes(
+                        routes,
+                        request.user_prompt,
+                        min_images_per_route=min_imgs,
+                        max_images_per_route=max_imgs,
+                        baseline_duration=baseline_duration,
+                        executor=self.score_pool if self.scorer_max_workers > 1 and len(routes) > 1 else None,
+                    )
+                except Exception as e:
+                    # Fall back to per-route scoring so one bad route doesn't drop the rest
+                    self.logger.warning("Batched scoring failed: %s; scoring routes individually.", e)
+                    for r in routes:
                         try:
-                            scored.append(fut.result())
+                            scored.append(_score_one(r))
                         except Exception as e:
                             self.logger.warning("Scoring failed: %s", e)
                 timings["score_parallel"] = time.time() - t
 
             scored.sort(key=lambda s: s.overall_score, reverse=True)
-            max_results = max(1, int(request.max_results or 3))
             top = scored[:max_results]
 
             # 7) API shaping
-            def _route_to_api(o: RouteScore) -> Dict[str, Any]:
+            def _route_to_api(o: "RouteScore") -> Dict[str, Any]:
                 r = o.route
                 return {
                     "score": round(float(o.overall_score), 3),
@@ -598,6 +705,20 @@ class RouteOrchestrator:
             self.logger.exception("Error generating routes: %s", e)
             raise
 
+    @property
+    def route_scorer(self) -> "RouteScorer":
+        if self._route_scorer is None:
+            with self._scorer_lock:
+                if self._route_scorer is None:
+                    from backend.scoring.route_scorer import RouteScorer
+                    self._route_scorer = RouteScorer(**self._scorer_args)
+        return self._route_scorer
+
+    def close(self) -> None:
+        """Release the orchestrator's worker pools (in-flight tasks finish in the background)."""
+        for pool in (self.pool, self.rb_pool, self.score_pool):
+            pool.shutdown(wait=False)
+
     def health_check(self) -> Dict[str, Any]:
         return {
             "extractor": "healthy",
@@ -89,14 +89,17 @@ class RouteOrchestratorSync:
         return {
             "center": self._coords_to_dict(iso.center),
             "travel_time_minutes": int(iso.travel_time_minutes),
-            "polygon": [self._coords_to_dict(p) for p in iso.polygon],
+            "polygon": [
+                {"latitude": lat, "longitude": lon} for lat, lon in zip(iso.lats.tolist(), iso.lons.tolist())
+            ],
         }
 
     def _iso_from_dict(self, d: Dict[str, Any]) -> Isochrone:
         return Isochrone(
             center=self._coords_from_dict(d["center"]),
             travel_time_minutes=int(d["travel_time_minutes"]),
-            polygon=[self._coords_from_dict(p) for p in d.get("polygon", [])],
+            lats=[float(p["latitude"]) for p in d.get("polygon", [])],
+            lons=[float(p["longitude"]) for p in d.get("polygon", [])],
         )
 
     def _zone_to_dict(self, z: SearchZone) -> Dict[str, Any]:
@@ -12,8 +12,9 @@ from dataclasses import dataclass
 import json
 import time
 import requests
+from requests.adapters import HTTPAdapter
 
-from backend.geocoding.geocoder import Coordinates
+from backend.geocoding.geocoder import Coordinates, HTTP_POOL_SIZE, HTTP_RETRY
 from backend.waypoints.waypoint_searcher import Waypoint
 
 
@@ -23,7 +24,7 @@ MAPBOX_OPTIMIZED_TRIPS_URL = "https://api.mapbox.com/optimized-trips/v1/mapbox"
 USER_AGENT = "berkeley-detourist/1.0 (berkeley.edu)"
 
 
-@dataclass
+@dataclass(slots=True)
 class RouteSegment:
     """A segment of a route between two points."""
     start: Coordinates
@@ -34,7 +35,7 @@ class RouteSegment:
     polyline: str  # encoded polyline6 from Mapbox
 
 
-@dataclass
+@dataclass(slots=True)
 class Route:
     """A complete route with waypoints."""
     origin: Coordinates
@@ -58,6 +59,11 @@ class RouteBuilder:
             "User-Agent": USER_AGENT,
             "Content-Type": "application/json",
         })
+        # Shared by the orchestrator's build threads: keep enough warm keep-alive
+        # connections for all of them, and retry Mapbox 429/5xx like the geocoder does
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=HTTP_RETRY)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
 
     # ----------------------- Public API -----------------------
 
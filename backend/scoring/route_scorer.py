@@ -11,6 +11,7 @@ This module handles:
 
 from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
+from concurrent.futures import Executor
 import os
 import logging
 import math
@@ -133,10 +134,13 @@ class RouteScorer:
         debug: bool = False,
         evaluation_mode: bool = False,
         baseline_duration: Optional[int] = None,
+        executor: Optional[Executor] = None,
     ) -> List[RouteScore]:
         """
         Score routes and return ranked results.
         If Mapillary token/scoring disabled or no images found, CLIP score becomes 0.
+        Images for all routes are scored in one CLIP forward pass; `executor`, if given,
+        fetches the routes' images concurrently.
         """
         if not routes:
             return []
@@ -152,33 +156,39 @@ class RouteScorer:
         if baseline_duration is None:
             baseline_duration = min(r.total_duration_seconds for r in routes)
 
-        # Pass 1: fetch images & compute raw clip scores
-        route_clip_scores: List[Tuple[float, List[float]]] = []
-        for i, route in enumerate(routes):
-            if debug:
-                logger.info(f"[scoring] Route {i+1}/{len(routes)}")
-
-            images: List[Image.Image] = []
-            if self.enable_scoring and self.mapillary_token and max_images_per_route > 0:
-                images = self._fetch_route_images_via_mapillary(
+        # Pass 1a: fetch images for every route
+        route_images: List[List[Image.Image]] = [[] for _ in routes]
+        if self.enable_scoring and self.mapillary_token and max_images_per_route > 0:
+            def _fetch(route: Route) -> List[Image.Image]:
+                return self._fetch_route_images_via_mapillary(
                     route,
                     min_images=min_images_per_route,
                     max_images=max_images_per_route,
                     debug=debug,
                 )
-                if debug:
-                    logger.debug(f"[scoring] Route {i+1}: fetched {len(images)} images")
-            else:
-                if debug:
-                    if not self.enable_scoring:
-                        logger.debug(f"[scoring] Route {i+1}: CLIP disabled (ENABLE_SCORING=false)")
-                    elif not self.mapillary_token:
-                        logger.debug(f"[scoring] Route {i+1}: No Mapillary token")
-                    elif max_images_per_route == 0:
-                        logger.debug(f"[scoring] Route {i+1}: max_images_per_route=0")
 
+            route_images = list(executor.map(_fetch, routes)) if executor else [_fetch(r) for r in routes]
+            if debug:
+                for i, images in enumerate(route_images):
+                    logger.debug(f"[scoring] Route {i+1}: fetched {len(images)} images")
+        elif debug:
+            if not self.enable_scoring:
+                logger.debug("[scoring] CLIP disabled (ENABLE_SCORING=false)")
+            elif not self.mapillary_token:
+                logger.debug("[scoring] No Mapillary token")
+            elif max_images_per_route == 0:
+                logger.debug("[scoring] max_images_per_route=0")
+
+        # Pass 1b: one CLIP batch over all routes' images, split back per route
+        all_scores = self._compute_clip_scores([img for images in route_images for img in images], user_prompt)
+        route_clip_scores: List[Tuple[float, List[float]]] = []
+        offset = 0
+        for i, images in enumerate(route_images):
+            if debug:
+                logger.info(f"[scoring] Route {i+1}/{len(routes)}")
             if images:
-                image_scores = self._compute_clip_scores(images, user_prompt)
+                image_scores = all_scores[offset: offset + len(images)]
+                offset += len(images)
                 clip_score = float(np.mean(image_scores)) if image_scores else 0.0
                 if debug:
                     logger.debug(
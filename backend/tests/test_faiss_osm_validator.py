@@ -0,0 +1,58 @@
+# backend/tests/test_faiss_osm_validator.py
+"""
+Offline tests for FAISSOSMTagDatabase.warm() against a scratch SQLite database
+(no embedding model or FAISS index is loaded).
+
+Run:
+  pytest -vv backend/tests/test_faiss_osm_validator.py
+"""
+
+import logging
+import sqlite3
+
+import numpy as np
+
+import backend.extraction.faiss_osm_validator as fov
+from backend.extraction.faiss_osm_validator import FAISSOSMTagDatabase
+
+
+def _database(tmp_path, n_tags, min_tag_count):
+    db_path = str(tmp_path / "tags.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE osm_tags (id INTEGER PRIMARY KEY, key TEXT, value TEXT, description TEXT, "
+        "count_all INTEGER, count_nodes INTEGER, count_ways INTEGER, count_relations INTEGER, "
+        "wiki_description TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO osm_tags VALUES (?, 'amenity', ?, '', ?, 0, 0, 0, '')",
+        [(i, f"v{i}", i % 3) for i in range(1, n_tags + 1)],
+    )
+    conn.commit()
+    conn.close()
+
+    db = FAISSOSMTagDatabase.__new__(FAISSOSMTagDatabase)
+    db.db_path = db_path
+    db.min_tag_count = min_tag_count
+    db.logger = logging.getLogger(__name__)
+    db._id_map = np.arange(n_tags, 0, -1, dtype=np.int64)  # FAISS rows in a different order than ids
+    db._row_tags = None
+    return db
+
+
+def test_warm_legacy_index_fetches_missing_ids_in_chunks(tmp_path):
+    # Every row is below the count threshold, so all ids take the by-id path; more ids than
+    # SQLite will bind in one statement, so a single "IN (...)" query would fail
+    limit = sqlite3.connect(":memory:").getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    n_tags = max(limit, fov.SQLITE_ID_CHUNK) + 7
+    db = _database(tmp_path, n_tags, min_tag_count=10)
+
+    assert db.warm() == n_tags
+    assert [row[0] for row in db._row_tags] == db._id_map.tolist()
+    assert db._row_tags[0][2] == f"v{n_tags}"
+
+
+def test_warm_without_index_loads_nothing(tmp_path):
+    db = _database(tmp_path, 0, min_tag_count=0)
+    assert db.warm() == 0
+    assert db._row_tags is None
@@ -0,0 +1,120 @@
+# backend/tests/test_geocoder_geometry.py
+"""
+Offline tests for the Geocoder's isochrone geometry (no Mapbox key needed).
+
+Isochrone requests are answered by a fake session that returns circular contours
+(radius proportional to minutes), so the search-zone pipeline runs end to end.
+
+Run:
+  pytest -vv backend/tests/test_geocoder_geometry.py
+"""
+
+import json
+
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Point, Polygon, box, mapping
+
+import backend.geocoding.geocoder as geocoder_mod
+from backend.geocoding.geocoder import Coordinates, Geocoder, Isochrone
+
+DEG_PER_MINUTE = 0.3 / 60
+
+
+class _FakeIsochroneResponse:
+    def __init__(self, center, minutes):
+        self._center = center
+        self._minutes = minutes
+
+    def raise_for_status(self):
+        pass
+
+    @property
+    def content(self):
+        features = [
+            {
+                "properties": {"contour": m},
+                "geometry": mapping(Point(*self._center).buffer(m * DEG_PER_MINUTE, 16)),
+            }
+            for m in self._minutes
+        ]
+        return json.dumps({"features": features}).encode()
+
+
+def _fake_get(url, params=None, timeout=None):
+    lon, lat = map(float, url.rsplit("/", 1)[1].split(","))
+    minutes = [int(m) for m in str(params["contours_minutes"]).split(",")]
+    return _FakeIsochroneResponse((lon, lat), minutes)
+
+
+@pytest.fixture
+def geocoder(monkeypatch):
+    monkeypatch.setattr(geocoder_mod, "ISO_DISK_CACHE_ENABLED", False)
+    g = Geocoder("test-key")
+    monkeypatch.setattr(g._session, "get", _fake_get)
+    monkeypatch.setattr(g, "shortest_travel_time_minutes", lambda *a, **k: 20)
+    return g
+
+
+def _full_union_area(g, origin, destination, max_travel_time, mode="driving"):
+    """Area (lon/lat degrees²) of the union of every combo's O/D isochrone intersection."""
+    overlaps = []
+    for o_min in range(0, max_travel_time + 1, 5):
+        inter = g._iso_geom(origin, o_min, mode).intersection(g._iso_geom(destination, max_travel_time - o_min, mode))
+        if not inter.is_empty:
+            overlaps.append(inter)
+    return shapely.union_all(overlaps).area
+
+
+def _zone_area(zone):
+    return shapely.Polygon([(c.longitude, c.latitude) for c in zone.intersection_polygon]).area
+
+
+def test_search_zone_matches_full_union(geocoder):
+    origin, destination = Coordinates(0.0, 0.0), Coordinates(0.0, 0.1)
+    zone = geocoder.create_search_zone(origin, destination, max_additional_time=20)
+
+    expected = _full_union_area(geocoder, origin, destination, 40)
+    assert expected > 0
+    assert _zone_area(zone) == pytest.approx(expected, rel=1e-3)
+
+
+def test_isochrone_polygon_round_trips_coordinates():
+    ring = [Coordinates(40.0, -74.0), Coordinates(40.1, -74.0), Coordinates(40.1, -73.9), Coordinates(40.0, -74.0)]
+    iso = Isochrone(center=Coordinates(40.05, -73.95), travel_time_minutes=10, polygon=ring)
+
+    assert iso.polygon == ring
+    assert iso.lats.dtype == np.float64 and iso.lats.tolist() == [c.latitude for c in ring]
+    assert iso.lons.tolist() == [c.longitude for c in ring]
+
+
+def test_isochrone_from_arrays_matches_polygon_form():
+    lats, lons = np.array([1.0, 2.0, 2.0, 1.0]), np.array([3.0, 3.0, 4.0, 3.0])
+    from_arrays = Isochrone(Coordinates(1.5, 3.5), 5, lats=lats, lons=lons)
+    from_polygon = Isochrone(Coordinates(1.5, 3.5), 5, polygon=from_arrays.polygon)
+
+    assert from_arrays == from_polygon  # arrays are excluded from comparison
+    assert from_polygon.polygon == from_arrays.polygon
+
+
+def test_isochrone_defaults_to_empty_ring():
+    iso = Isochrone(Coordinates(0.0, 0.0), 0)
+    assert iso.polygon == []
+    assert iso.lats.shape == (0,) and iso.lons.shape == (0,)
+
+
+def test_union_areas_empty_is_empty_polygon(geocoder):
+    result = geocoder._union_areas([])
+    assert isinstance(result, Polygon) and result.is_empty
+
+
+def test_union_areas_matches_union_all(geocoder):
+    # More pieces than UNION_CHUNK_SIZE, with overlaps and disjoint parts, so several chunk rounds run
+    geoms = [box(i, 0, i + 1.5, 1) for i in range(0, 12, 2)] + [Point(30, i).buffer(0.5 + i / 10) for i in range(8)]
+    assert len(geoms) > geocoder_mod.UNION_CHUNK_SIZE
+
+    result = geocoder._union_areas(geoms)
+    expected = shapely.union_all(geoms)
+    assert result.area == pytest.approx(expected.area)
+    assert result.symmetric_difference(expected).area == pytest.approx(0.0, abs=1e-9)
@@ -0,0 +1,42 @@
+# backend/tests/test_json_utils.py
+"""
+Offline tests for the shared JSON helpers (backend/json_utils.py).
+
+Run:
+  pytest -vv backend/tests/test_json_utils.py
+"""
+
+import pytest
+
+import backend.json_utils as json_utils
+from backend.json_utils import extract_json_span, json_dumps, json_loads
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": 1}', '{"a": 1}'),
+        ('Sure! Here it is:\n```json\n{"a": {"b": [1, 2]}}\n```', '{"a": {"b": [1, 2]}}'),
+        ('{"a": "}{"} and then {"b": 2}', '{"a": "}{"}'),  # braces inside strings are skipped
+        ('{"a": "say \\"hi\\" {"} trailing }', '{"a": "say \\"hi\\" {"}'),
+        ('{"a": 1} and a stray } brace', '{"a": 1}'),
+    ],
+)
+def test_extract_json_span_finds_first_balanced_object(text, expected):
+    span = extract_json_span(text)
+    assert span == expected
+    json_loads(span)
+
+
+@pytest.mark.parametrize("text", ["no json here", '{"a": 1', ""])
+def test_extract_json_span_none_without_closed_object(text):
+    assert extract_json_span(text) is None
+
+
+def test_stdlib_fallback_emits_same_bytes_as_orjson(monkeypatch):
+    pytest.importorskip("orjson")
+    payload = {"b": [1, 2.5, None, True], "a": "Café → Times Square", "c": {"z": 1, "y": "x"}}
+    fast = json_dumps(payload, sort_keys=True)
+    monkeypatch.setattr(json_utils, "ORJSON_AVAILABLE", False)
+    assert json_dumps(payload, sort_keys=True) == fast
+    assert json_loads(fast) == payload
@@ -0,0 +1,175 @@
+# backend/tests/test_llm_extractor.py
+"""
+Offline tests for LLMExtractor's local parsing: model-output coercion, the streaming
+JSON scanner and smart routing of bare "A to B" prompts. No OpenAI key or network needed.
+
+Run:
+  pytest -vv backend/tests/test_llm_extractor.py
+"""
+
+import json
+
+import pytest
+
+import backend.extraction.llm_extractor as llm_extractor
+from backend.extraction.llm_extractor import (
+    LLMExtractor,
+    _TopLevelJSONScanner,
+    _coerce,
+    _to_bool,
+    _to_int,
+    _to_tags,
+)
+
+
+# ---------- Coercion ----------
+
+@pytest.mark.parametrize(
+    "value, default, expected",
+    [
+        (True, False, True),
+        (False, True, False),
+        (None, True, True),
+        (None, False, False),
+        ("true", False, True),
+        (" Yes ", False, True),
+        ("1", False, True),
+        ("false", True, False),  # bool("false") would be True
+        ("no", True, False),
+        ("", True, False),
+        (1, False, True),
+        (0, True, False),
+    ],
+)
+def test_to_bool(value, default, expected):
+    assert _to_bool(value, default) is expected
+
+
+def test_coerce_takes_first_non_null_key():
+    data = {"origin": None, "origin_text": "Brooklyn"}
+    assert _coerce(data, ("origin", "origin_text"), lambda v, d: v if isinstance(v, str) else d, "") == "Brooklyn"
+
+
+def test_coerce_missing_or_malformed_values_fall_back_to_default():
+    assert _coerce({}, ("time_flexibility_minutes",), _to_int, 10) == 10
+    assert _coerce({"time_flexibility_minutes": "soon"}, ("time_flexibility_minutes",), _to_int, 10) == 10
+    assert _coerce({"time_flexibility_minutes": "25"}, ("time_flexibility_minutes",), _to_int, 10) == 25
+
+
+def test_coerce_tags_keeps_non_empty_strings_only():
+    raw = ["leisure=park", "", 3, None, "  ", "amenity=cafe"]
+    assert _coerce({"waypoint_queries": raw}, ("waypoint_queries",), _to_tags, None) == ["leisure=park", "amenity=cafe"]
+    assert _coerce({"waypoint_queries": "leisure=park"}, ("waypoint_queries",), _to_tags, None) == []
+
+
+# ---------- Streaming scanner ----------
+
+ANSWER = {
+    "origin": 'A, "quoted" {x}',
+    "destination": "B",
+    "waypoint_queries": ["leisure=park", "amenity=cafe"],
+    "constraints": {"transport_mode": "walking", "avoid_hills": True},
+}
+
+
+def _fragments(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64])
+def test_scanner_yields_growing_prefixes_then_full_object(size):
+    text = "```json\n" + json.dumps(ANSWER) + "\n```"
+    scanner = _TopLevelJSONScanner()
+    seen = []
+    for fragment in _fragments(text, size):
+        if scanner.feed(fragment):
+            seen.append(list(scanner.parsed()))
+
+    assert scanner.complete
+    assert scanner.parsed() == ANSWER
+    # Members arrive in order, each prefix a subset of the next
+    assert seen[-1] == list(ANSWER)
+    for earlier, later in zip(seen, seen[1:]):
+        assert later[: len(earlier)] == earlier
+
+
+def test_scanner_truncated_stream_keeps_complete_members_only():
+    text = json.dumps(ANSWER)
+    cut = text.index('"waypoint_queries"') + len('"waypoint_queries": ["leisure')
+    scanner = _TopLevelJSONScanner()
+    scanner.feed(text[:cut])
+
+    assert not scanner.complete
+    assert scanner.parsed() == {"origin": ANSWER["origin"], "destination": "B"}
+
+
+def test_scanner_without_members_parses_empty():
+    scanner = _TopLevelJSONScanner()
+    assert scanner.feed('{"orig') is False
+    assert scanner.parsed() == {}
+
+
+# ---------- Smart routing of bare prompts ----------
+
+@pytest.fixture
+def extractor(monkeypatch):
+    monkeypatch.setattr(llm_extractor, "SMART_ROUTING_ENABLED", True)
+    ex = LLMExtractor("sk-test")
+    yield ex
+    ex.close()
+
+
+@pytest.mark.parametrize(
+    "prompt, origin, destination, mode",
+    [
+        ("Brooklyn to Times Square", "Brooklyn", "Times Square", llm_extractor.DEFAULT_TRANSPORT_MODE),
+        ("walk from Union Square to Chelsea Market.", "Union Square", "Chelsea Market", "walking"),
+        ("Drive Oakland -> Berkeley", "Oakland", "Berkeley", "driving"),
+        ("Penn Station → Grand Central", "Penn Station", "Grand Central", llm_extractor.DEFAULT_TRANSPORT_MODE),
+    ],
+)
+def test_simple_prompt_is_parsed_locally(extractor, prompt, origin, destination, mode):
+    params = extractor._parse_simple_prompt(prompt)
+
+    assert params is not None
+    assert (params.origin, params.destination) == (origin, destination)
+    assert params.constraints["transport_mode"] == mode
+    assert params.waypoint_queries == [] and params.preferences == ""
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    [
+        "Brooklyn to Times Square via a coffee shop",
+        "walk from Union Square to Chelsea Market past some parks",
+        "find me a scenic route",
+        "Brooklyn to Times Square with 20 extra minutes",
+        "A to " + "B" * 150,
+        # Preference phrasings that look like "A to B" but name no places
+        "coffee to go",
+        "Things to do",
+        "Ways to relax",
+        "somewhere to eat",
+        "brooklyn to times square",
+        "Cafe to Library, Berkeley",
+    ],
+)
+def test_prompt_with_details_goes_to_llm(extractor, prompt):
+    assert extractor._parse_simple_prompt(prompt) is None
+
+
+def test_smart_routing_can_be_disabled(extractor, monkeypatch):
+    monkeypatch.setattr(llm_extractor, "SMART_ROUTING_ENABLED", False)
+    assert extractor._parse_simple_prompt("Brooklyn to Times Square") is None
+
+
+# ---------- Keyword-list preferences ----------
+
+def test_keyword_preferences_are_opt_in_and_independent_of_smart_routing(extractor, monkeypatch):
+    monkeypatch.setattr(llm_extractor, "KEYWORD_PREFERENCES_ENABLED", False)
+    assert extractor._keyword_preferences("coffee, bookstore, park") is None
+
+    monkeypatch.setattr(llm_extractor, "SMART_ROUTING_ENABLED", False)
+    monkeypatch.setattr(llm_extractor, "KEYWORD_PREFERENCES_ENABLED", True)
+    assert extractor._keyword_preferences(" coffee, bookstore, park ") == "coffee, bookstore, park"
+    assert extractor._keyword_preferences("find coffee, then a park") is None
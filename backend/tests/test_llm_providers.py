@@ -0,0 +1,55 @@
+# backend/tests/test_llm_providers.py
+"""
+Offline tests for the LLM provider HTTP plumbing (no Ollama/OpenAI needed).
+
+Run:
+  pytest -vv backend/tests/test_llm_providers.py
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+import urllib3
+
+from backend.extraction.llm_providers import _OLLAMA_RETRY, _post_json
+
+
+@pytest.fixture
+def silent_server():
+    """Local server that accepts connections but never answers; yields (url, accepted)."""
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.bind(("127.0.0.1", 0))
+    srv.listen(8)
+    srv.settimeout(0.1)
+    accepted = []
+    stop = threading.Event()
+
+    def _serve():
+        while not stop.is_set():
+            try:
+                conn, _ = srv.accept()
+            except socket.timeout:
+                continue
+            accepted.append(conn)
+
+    t = threading.Thread(target=_serve, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.getsockname()[1]}/api/generate", accepted
+    stop.set()
+    t.join(timeout=1)
+    for conn in accepted:
+        conn.close()
+    srv.close()
+
+
+def test_ollama_read_timeout_is_not_retried(silent_server):
+    url, accepted = silent_server
+    t0 = time.monotonic()
+    with pytest.raises(urllib3.exceptions.TimeoutError):
+        _post_json(url, {"prompt": "hi"}, {"Content-Type": "application/json"}, timeout=0.3, retries=_OLLAMA_RETRY)
+    elapsed = time.monotonic() - t0
+
+    assert len(accepted) == 1
+    assert elapsed < 1.0
@@ -0,0 +1,156 @@
+# backend/tests/test_orchestrator.py
+"""
+Offline tests for RouteOrchestrator's candidate generation and routes cache key.
+Every external module (LLM, Mapbox, Overpass, CLIP, Redis) is replaced by an in-memory fake.
+
+Run:
+  pytest -vv backend/tests/test_orchestrator.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("redis")
+
+from backend.extraction.llm_extractor import ExtractedParameters
+from backend.geocoding.geocoder import Coordinates, Isochrone, SearchZone
+from backend.orchestrator import Cache, RouteOrchestrator, RouteRequest, _candidate_indices
+from backend.routing.route_builder import Route
+from backend.waypoints.waypoint_searcher import Waypoint
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+ORIGIN, DEST = Coordinates(40.70, -74.00), Coordinates(40.75, -73.98)
+
+
+class FakeCache:
+    """Cache stand-in: same get/set API, values kept as JSON round-trips in a dict."""
+
+    def __init__(self):
+        self.store = {}
+        self.writes = []
+
+    def get_json(self, namespace, payload):
+        return self.store.get((namespace, json.dumps(payload, sort_keys=True)))
+
+    def get_json_many(self, items):
+        return [self.get_json(ns, payload) for ns, payload in items]
+
+    def set_json(self, namespace, payload, value, ttl_seconds=600):
+        self.writes.append((namespace, payload))
+        self.store[(namespace, json.dumps(payload, sort_keys=True))] = json.loads(json.dumps(value))
+
+
+def _waypoints(n):
+    return [
+        Waypoint(f"wp{i}", Coordinates(40.72 + i * 0.001, -73.99), "park", 10.0 - i, {}, "leisure=park")
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def orch(monkeypatch):
+    monkeypatch.delenv("ENABLE_SCORING", raising=False)
+    monkeypatch.delenv("FORCE_TRANSPORT_MODE", raising=False)
+    o = RouteOrchestrator({})
+    o.cache = FakeCache()
+    o.route_max_single, o.route_max_pairs, o.route_max_triples = 3, 2, 0
+    o.max_wp_per_route, o.rb_max_candidates, o.wp_top_k = 3, 0, 12
+
+    o.built = []
+
+    def build_single_route(origin, dest, waypoints, constraints):
+        o.built.append(tuple(w.name for w in waypoints))
+        return Route(origin, dest, list(waypoints), [], 1000.0 + len(waypoints), 600, {}, [])
+
+    o.extractor = SimpleNamespace(
+        extract_parameters=lambda prompt: ExtractedParameters(
+            "A", "B", 20, ["leisure=park"], {"transport_mode": "walking"}, "parks"
+        )
+    )
+    o.geocoder = SimpleNamespace(
+        geocode_address=lambda text: ORIGIN if text == "A" else DEST,
+        create_search_zone=lambda **kw: SearchZone(Isochrone(ORIGIN, 10), Isochrone(DEST, 10), []),
+    )
+    o.waypoint_searcher = SimpleNamespace(search_waypoints=lambda zone, queries: _waypoints(5))
+    o.route_builder = SimpleNamespace(
+        get_baseline_duration=lambda *a: 600,
+        build_single_route=build_single_route,
+        build_direct_route=lambda origin, dest, constraints: build_single_route(origin, dest, [], constraints),
+    )
+    o._route_scorer = SimpleNamespace(
+        score_routes=lambda routes, prompt, **kw: [
+            SimpleNamespace(route=r, overall_score=1.0, clip_score=0.0, efficiency_score=1.0,
+                            preference_match_score=0.0, num_images=0)
+            for r in routes
+        ]
+    )
+    yield o
+    o.close()
+
+
+def _routes_key(orch):
+    keys = [payload for ns, payload in orch.cache.writes if ns == "routes_v3"]
+    assert len(keys) == 1
+    return keys[0]
+
+
+def test_make_candidates_follows_candidate_knobs(orch):
+    wps = _waypoints(5)
+    candidates = orch._make_candidates(wps, already_sorted=True)
+
+    names = [tuple(w.name for w in c) for c in candidates]
+    assert names == [(), ("wp0",), ("wp1",), ("wp2",), ("wp0", "wp1"), ("wp0", "wp2")]
+    assert len(candidates) == len(_candidate_indices(len(wps), *orch._candidate_knobs()))
+
+
+def test_routes_key_carries_cand_spec_and_is_reused(orch):
+    orch.generate_routes(RouteRequest("walk A to B via parks"))
+    first_builds = len(orch.built)
+    key = _routes_key(orch)
+
+    assert key["cand_spec"] == [orch.wp_top_k, *orch._candidate_knobs(), 0]
+    assert first_builds == 6
+
+    # Same request again: served from the routes cache, nothing rebuilt
+    orch.generate_routes(RouteRequest("walk A to B via parks"))
+    assert len(orch.built) == first_builds
+
+
+def test_routes_key_changes_with_candidate_knobs(orch):
+    orch.generate_routes(RouteRequest("walk A to B via parks"))
+    before = _routes_key(orch)
+
+    orch.cache.writes.clear()
+    orch.route_max_pairs = 0
+    orch.generate_routes(RouteRequest("walk A to B via parks"))
+    after = _routes_key(orch)
+
+    assert before["cand_spec"] != after["cand_spec"]
+    assert {k: v for k, v in before.items() if k != "cand_spec"} == {k: v for k, v in after.items() if k != "cand_spec"}
+
+
+def test_routes_key_hash_is_stable_across_processes(orch):
+    orch.generate_routes(RouteRequest("walk A to B via parks"))
+    payload = json.dumps(_routes_key(orch))
+    script = (
+        "import json, sys; from backend.orchestrator import Cache; "
+        "print(Cache()._hash_key('routes_v3', json.loads(sys.argv[1])))"
+    )
+
+    hashes = set()
+    for seed in ("1", "2"):
+        env = {**os.environ, "PYTHONHASHSEED": seed}
+        out = subprocess.run(
+            [sys.executable, "-c", script, payload], cwd=PROJECT_ROOT, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        hashes.add(out.stdout.strip().splitlines()[-1])
+
+    assert len(hashes) == 1
+    assert hashes == {Cache()._hash_key("routes_v3", json.loads(payload))}
@@ -15,6 +15,8 @@ import os
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import numpy as np
+import shapely
 from shapely.geometry import Point, Polygon
 
 from backend.geocoding.geocoder import SearchZone, Coordinates
@@ -24,7 +26,7 @@ OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 USER_AGENT = "berkeley-detourist/1.0 (berkeley.edu)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Waypoint:
     """A point of interest that can be used as a route waypoint."""
     name: str
@@ -182,14 +184,22 @@ class WaypointSearcher:
         poly = self._zone_polygon(search_zone)
         if poly is None or poly.is_empty:
             return []
-        inside: List[Dict] = []
+        located: List[Dict] = []
+        lons: List[float] = []
+        lats: List[float] = []
         for e in pois:
             pt = self._element_point(e)
             if pt is None:
                 continue
-            if poly.contains(pt) or poly.touches(pt):
-                inside.append(e)
-        return inside
+            located.append(e)
+            lons.append(pt.x)
+            lats.append(pt.y)
+        if not located:
+            return []
+        # One vectorized covers() (= contains or touches) against the prepared zone
+        shapely.prepare(poly)
+        mask = shapely.covers(poly, shapely.points(np.array(lons), np.array(lats)))
+        return [e for e, keep in zip(located, mask.tolist()) if keep]
 
     def _element_point(self, element: Dict[str, Any]) -> Optional[Point]:
         """Representative point for an OSM element (node/way/relation)."""